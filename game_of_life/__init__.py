@@ -0,0 +1,7 @@
+#core engines of the Game of Life; matplotlib and tkinter are only loaded by the renderer, interactive and gui modules
+from .life import (NEIGHBORS, DEFAULT_MEMORY_BUDGET, init_life_state_1, init_life_state_2, count_neighbors,
+                   count_neighbors_grid, get_band_rows, update_life_state_1, apply_rule_2, update_life_state_2)
+from .rules import (init_life_state_3, get_neighbors, handle_probabilities_rule, update_life_state_3,
+                    get_neighbors_tensor, compile_probabilities_rule, compile_rules, get_program_types,
+                    update_life_state_3_compiled)
+from .io import save_to_csv, save_state_to_csv, save_rules_to_json, load_rules_from_json
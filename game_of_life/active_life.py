@@ -0,0 +1,123 @@
+import numpy as np
+
+from .life import NEIGHBORS, count_neighbors_grid
+from .cycles import create_cycle_detector, update_cycle_detector
+
+
+#helper function that returns the cells that may change: the changed cells and their neighbors
+def get_frontier(changed_cells, n, m):
+    """
+    Expand the cells that changed in the last generation to every cell whose neighbor count may have changed.
+
+    IN:
+        changed_cells (tuple of two 1D ndarrays): row and column indices of the changed cells, as from np.nonzero.
+        n, m (int): dimensions of the grid.
+
+    OUT:
+        tuple of two 1D ndarrays: sorted, unique row and column indices of the cells to recompute.
+    """
+    rows, cols = changed_cells
+    offsets = np.array([(0, 0)] + NEIGHBORS)
+    frontier_rows = (rows[None, :] + offsets[:, 0:1]).ravel()
+    frontier_cols = (cols[None, :] + offsets[:, 1:2]).ravel()
+    inside = (0 <= frontier_rows) & (frontier_rows < n) & (0 <= frontier_cols) & (frontier_cols < m)
+    linear = np.unique(frontier_rows[inside] * m + frontier_cols[inside])
+    return np.divmod(linear, m)
+
+
+#helper function that returns the number of alive neighbors of the given cells only
+def count_neighbors_cells(life_state, rows, cols):
+    n, m = life_state.shape
+    counts = np.zeros(len(rows), dtype=np.result_type(life_state.dtype, np.int_))
+    for di, dj in NEIGHBORS:
+        ni, nj = rows + di, cols + dj
+        # Check if the neighbor is within bounds, cells outside the grid are dead
+        inside = (0 <= ni) & (ni < n) & (0 <= nj) & (nj < m)
+        counts[inside] += life_state[ni[inside], nj[inside]]
+    return counts
+
+
+def update_life_state_active(life_state, changed_cells=None, b1=3, b2=3, d1=2, d2=3,
+                             out_life_state=None, dense_fraction=0.25):
+    """
+    Compute the next generation like update_life_state_2, but only recompute the cells around the
+    cells that changed in the last generation. Falls back to a full sweep when the board is busy.
+
+    IN:
+        life_state (ndarray): Current state of the grid (n, m).
+        changed_cells (tuple of two 1D ndarrays, optional): row and column indices of the cells that changed
+                                                           to produce life_state. If None, every cell is recomputed.
+        b1, b2 (int): Lower and upper bound of the number of neighbors for a dead cell to come to life.
+        d1, d2 (int): Lower and upper bound of the number of neighbors for an alive cell to continue being alive.
+        out_life_state (ndarray, optional): the previous generation (the life_state of the previous call), which is
+                                            reused as the output buffer. Only the changed cells are refreshed, so
+                                            any other array must not be passed here. If None, a new array is created.
+        dense_fraction (float): when the changed cells and their neighbors are more than this fraction of the grid,
+                                the whole grid is swept instead.
+
+    OUT:
+        out_life_state (ndarray): The next state of the grid (n, m).
+        changed_cells (tuple of two 1D ndarrays): row and column indices of the cells that changed in this generation.
+    """
+    n, m = life_state.shape
+
+    # Busy (or unknown) board: sweep every cell at once
+    if changed_cells is None or 9 * len(changed_cells[0]) > dense_fraction * n * m:
+        if out_life_state is None:
+            out_life_state = np.empty_like(life_state)
+        alive_neighbors = count_neighbors_grid(life_state)
+        born = (b1 <= alive_neighbors) & (alive_neighbors <= b2)
+        survives = (d1 <= alive_neighbors) & (alive_neighbors <= d2)
+        np.copyto(out_life_state, np.where(life_state == 0, born, survives))
+        return out_life_state, np.nonzero(out_life_state != life_state)
+
+    # Bring the output buffer up to date: it only differs from life_state in the cells that just changed
+    if out_life_state is None:
+        out_life_state = life_state.copy()
+    else:
+        out_life_state[changed_cells] = life_state[changed_cells]
+
+    # Only the changed cells and their neighbors can change in this generation
+    rows, cols = get_frontier(changed_cells, n, m)
+    alive_neighbors = count_neighbors_cells(life_state, rows, cols)
+    old_values = life_state[rows, cols]
+    born = (b1 <= alive_neighbors) & (alive_neighbors <= b2)
+    survives = (d1 <= alive_neighbors) & (alive_neighbors <= d2)
+    new_values = np.where(old_values == 0, born, survives)
+
+    changed = new_values != old_values
+    rows, cols = rows[changed], cols[changed]
+    out_life_state[rows, cols] = new_values[changed]
+    return out_life_state, (rows, cols)
+
+
+def play_life_state_active(life_state, num_iterations, b1=3, b2=3, d1=2, d2=3, dense_fraction=0.25,
+                           stop_on_cycle=False):
+    """
+    Run several generations with the active-region engine, swapping two buffers between generations.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the initial state of the grid.
+        num_iterations (int): number of generations to run.
+        b1, b2, d1, d2 (int): the custom bounds, see update_life_state_active.
+        dense_fraction (float): see update_life_state_active.
+        stop_on_cycle (bool): also stop once the board settles into an oscillator. The board is fingerprinted
+                              from the changed cells the engine already returns (see cycles.py).
+
+    OUT:
+        ndarray of shape (n, m): the grid after num_iterations generations (or at the end of the first cycle).
+    """
+    current = life_state.copy()
+    previous = None
+    changed_cells = None
+    detector = create_cycle_detector(current) if stop_on_cycle else None
+    for iteration in range(num_iterations):
+        new, changed_cells = update_life_state_active(current, changed_cells, b1, b2, d1, d2,
+                                                      out_life_state=previous, dense_fraction=dense_fraction)
+        previous, current = current, new
+        # A board where nothing changed will never change again
+        if len(changed_cells[0]) == 0:
+            break
+        if detector is not None and update_cycle_detector(detector, current, changed_cells=changed_cells):
+            break
+    return current
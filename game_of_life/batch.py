@@ -0,0 +1,286 @@
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+from .life import init_life_state_1, init_life_state_2, update_life_state_1, update_life_state_2
+from .rules import init_life_state_3, compile_rules, get_program_types, update_life_state_3_compiled
+from .io import save_to_csv, save_rules_to_json, load_rules_from_json
+from .ensemble import get_num_states
+from .trajectory import create_trajectory, append_generation, close_trajectory
+from .checkpoint import (load_checkpoint, restore_rng_state, create_checkpoint_writer, update_checkpoint_writer,
+                         close_checkpoint_writer)
+from .statistics import create_statistics, record_generation, close_statistics
+from .instrumentation import (create_recorder, start_recording, stop_recording, phase, end_generation,
+                              summarize_phases, export_chrome_trace)
+
+#settings used when neither the config file nor the command line gives a value
+DEFAULT_CONFIG = {
+    'level': 1,
+    'rows': 30,
+    'columns': 30,
+    'probability': 0.2,       # level 1 and 2: probability of a cell being alive
+    'probabilities': None,    # level 3: probability of each state
+    'states': None,           # level 3: the possible states
+    'rules': None,            # level 3: JSON rules file or rules dict
+    'b1': 3, 'b2': 3, 'd1': 2, 'd2': 3,
+    'iterations': 100,
+    'seed': None,
+    'output_dir': 'output',
+    'save_every': 0,          # also save the grid every this many generations (0 = never)
+    'trajectory': False,      # record every generation to trajectory.bin
+    'keyframe_interval': 100, # store the whole grid in the trajectory every this many generations
+    'trace': False,           # record the time of every phase to trace.json (Chrome trace format)
+    'trace_every': 1,         # only trace every this many generations
+    'checkpoint_every': 0,    # save checkpoint.npz every this many generations (0 = never)
+    'resume': None,           # checkpoint file to continue a run from
+    'statistics': False,      # record the population, births, deaths and changed cells to statistics.bin
+}
+
+
+def load_config(filename):
+    """
+    Load batch settings from a JSON file, e.g. {"level": 2, "rows": 500, "iterations": 1000, "b1": 3}.
+    IN:
+        filename (str): The name of the JSON file.
+    OUT:
+        dict: the settings, with DEFAULT_CONFIG filling in the missing ones.
+    """
+    with open(filename, 'r') as file:
+        config = json.load(file)
+    return {**DEFAULT_CONFIG, **config}
+
+
+def setup_level(config):
+    """
+    Build the initial grid and the update function of a level from batch settings.
+    IN:
+        config (dict): the settings, see DEFAULT_CONFIG.
+    OUT:
+        (life_state, step, rules, num_states, rng): the initial grid, a function step(life_state, out,
+                                                    statistics=None) that returns the next generation (possibly
+                                                    written into out) and records it in statistics if given, the
+                                                    rules to save (None for level 1), the number of cell states and
+                                                    the random generator step uses (None for levels 1 and 2).
+    """
+    level, n, m = config['level'], config['rows'], config['columns']
+    np.random.seed(config['seed'])
+
+    if level == 1:
+        life_state = init_life_state_1(n, m, config['probability'])
+        def step(state, out, statistics=None):
+            # The level 1 rules never write the dead cells that stay dead, so the output starts all dead
+            out.fill(0)
+            return update_life_state_1(state, out_life_state=out, statistics=statistics)
+        return life_state, step, None, 2, None
+
+    if level == 2:
+        life_state = init_life_state_2(n, m, config['probability'])
+        b1, b2, d1, d2 = config['b1'], config['b2'], config['d1'], config['d2']
+        step = lambda state, out, statistics=None: update_life_state_2(state, b1, b2, d1, d2, out_life_state=out,
+                                                                      statistics=statistics)
+        return life_state, step, {'b1': b1, 'b2': b2, 'd1': d1, 'd2': d2}, 2, None
+
+    if level == 3:
+        rules = config['rules']
+        if isinstance(rules, str):
+            rules = load_rules_from_json(rules)
+        rules = {int(key): value for key, value in rules.items()}
+        states = config['states'] if config['states'] is not None else sorted(rules)
+        life_state = init_life_state_3(n, m, config['probabilities'], states)
+        program = compile_rules(rules)
+        neighbor_counts = np.empty((len(get_program_types(program)), n, m), dtype=np.uint8)
+        one_hot = np.empty((n, m), dtype=bool)
+        rng = np.random.default_rng(config['seed'])
+
+        def step(state, out, statistics=None):
+            # Cells without a matching rule keep their state, so the output starts as a copy
+            np.copyto(out, state)
+            return update_life_state_3_compiled(state, program, out_life_state=out,
+                                                neighbor_counts=neighbor_counts, rng=rng, statistics=statistics,
+                                                one_hot=one_hot)
+        return life_state, step, rules, get_num_states(program, life_state), rng
+
+    raise ValueError(f"Unknown level {level}, expected 1, 2 or 3.")
+
+
+#helper function that returns the rows of an earlier populations.csv up to (and including) a generation
+def _read_populations(filename, generation):
+    if not os.path.exists(filename):
+        return []
+    with open(filename, mode='r', newline='') as file:
+        rows = list(csv.reader(file))[1:]
+    return [row for row in rows if int(row[0]) <= generation]
+
+
+def run_batch(config):
+    """
+    Run one simulation without any window or prompt and stream its results to disk.
+
+    Written to config['output_dir']:
+        initial_state.csv, final_state.csv: the first and last grid.
+        populations.csv: one row per generation with the number of cells in each state, written as it runs.
+        state_<generation>.csv: the grid every config['save_every'] generations (if set).
+        rules.json: the rules that were used (levels 2 and 3).
+        trajectory.bin: every generation, if config['trajectory'] is set (read it with trajectory.open_trajectory).
+        trace.json: the time spent in every phase of every generation, if config['trace'] is set
+                    (open it in chrome://tracing, ui.perfetto.dev or speedscope).
+        statistics.bin: the number of cells in each state, births, deaths and changed cells of every generation,
+                        counted by the update itself, if config['statistics'] is set (read it with
+                        statistics.read_statistics).
+        checkpoint.npz: the grid, settings, rules, generation and random state every config['checkpoint_every']
+                        generations and at the end (if set), written in the background.
+
+    With config['resume'] set to a checkpoint file, the run continues from that checkpoint with the settings
+    stored in it (the values in config override them, e.g. a larger 'iterations') and gives exactly the same
+    grids as a run that never stopped.
+
+    IN:
+        config (dict): the settings, see DEFAULT_CONFIG.
+    OUT:
+        ndarray of shape (rows, columns): the final grid.
+    """
+    checkpoint = None
+    if config.get('resume'):
+        checkpoint = load_checkpoint(config['resume'])
+        config = {**checkpoint['config'], **config}
+    config = {**DEFAULT_CONFIG, **config}
+    output_dir = config['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+
+    recorder = None
+    if config['trace']:
+        recorder = create_recorder(sample_every=config['trace_every'])
+        start_recording(recorder)
+
+    life_state, step, rules, num_states, rng = setup_level(config)
+    start = 0
+    if checkpoint is None:
+        save_to_csv(life_state, os.path.join(output_dir, 'initial_state.csv'))
+        if rules is not None:
+            save_rules_to_json(rules, os.path.join(output_dir, 'rules.json'))
+    else:
+        if config['trajectory'] or config['statistics']:
+            raise ValueError("A trajectory or statistics file cannot be continued from a checkpoint, resume without "
+                             "'trajectory' and 'statistics'.")
+        life_state, start = checkpoint['life_state'], checkpoint['generation']
+        restore_rng_state(checkpoint, rng)
+
+    checkpoint_writer = None
+    if config['checkpoint_every']:
+        checkpoint_writer = create_checkpoint_writer(os.path.join(output_dir, 'checkpoint.npz'), life_state,
+                                                     config['checkpoint_every'])
+        # The checkpoint keeps the rules themselves, not the name of the file they came from
+        checkpoint_config = {**config, 'rules': rules} if config['level'] == 3 else config
+
+    trajectory = None
+    if config['trajectory']:
+        trajectory = create_trajectory(os.path.join(output_dir, 'trajectory.bin'), life_state,
+                                       num_states=max(num_states, 2), keyframe_interval=config['keyframe_interval'])
+
+    statistics = None
+    if config['statistics']:
+        statistics = create_statistics(os.path.join(output_dir, 'statistics.bin'), num_states=max(num_states, 2))
+        record_generation(statistics, life_state)
+
+    buffer = np.empty_like(life_state)
+    populations_filename = os.path.join(output_dir, 'populations.csv')
+    rows = _read_populations(populations_filename, start) if checkpoint is not None else []
+    with open(populations_filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['generation'] + [f'state_{state}' for state in range(num_states)])
+        writer.writerows(rows)
+        if not rows:
+            writer.writerow([start] + np.bincount(life_state.ravel().astype(np.intp), minlength=num_states).tolist())
+        for iteration in range(start + 1, config['iterations'] + 1):
+            with phase('update'):
+                new_life_state = step(life_state, buffer, statistics)
+            # Swap the buffers instead of allocating a new grid every generation
+            buffer, life_state = life_state, new_life_state
+            with phase('save_populations'):
+                if statistics is not None:
+                    # The update already counted the states
+                    counts = statistics['counts'][:num_states]
+                else:
+                    counts = np.bincount(life_state.ravel().astype(np.intp), minlength=num_states)
+                writer.writerow([iteration] + counts.tolist())
+            if config['save_every'] and iteration % config['save_every'] == 0:
+                save_to_csv(life_state, os.path.join(output_dir, f'state_{iteration}.csv'))
+            if trajectory is not None:
+                append_generation(trajectory, life_state)
+            end_generation(life_state, buffer)
+            if checkpoint_writer is not None:
+                buffer = update_checkpoint_writer(checkpoint_writer, life_state, buffer, iteration, checkpoint_config,
+                                                  rng)
+    if trajectory is not None:
+        close_trajectory(trajectory)
+    if statistics is not None:
+        close_statistics(statistics)
+    if checkpoint_writer is not None:
+        close_checkpoint_writer(checkpoint_writer, life_state, max(start, config['iterations']), checkpoint_config, rng)
+
+    save_to_csv(life_state, os.path.join(output_dir, 'final_state.csv'))
+    if recorder is not None:
+        stop_recording()
+        export_chrome_trace(recorder, os.path.join(output_dir, 'trace.json'))
+        for name, times in summarize_phases(recorder).items():
+            print(f"{name:20} {times['total_ms']:10.1f} ms total, {times['mean_ms']:8.3f} ms mean")
+    return life_state
+
+
+def main(argv=None):
+    """
+    Command line entry point, e.g.
+        python batch.py --level 2 --rows 500 --columns 500 --b1 3 --b2 3 --d1 2 --d2 3 --iterations 1000 --seed 1
+        python batch.py --config run.json --output-dir results/run1
+        python batch.py --resume results/run1/checkpoint.npz --iterations 2000
+    Command line values override the config file.
+    IN:
+        argv (list of str, optional): the arguments, defaults to sys.argv.
+    OUT: None
+    """
+    parser = argparse.ArgumentParser(description="Run the Game of Life without a display or prompts.")
+    parser.add_argument('--config', help="JSON file with the settings")
+    parser.add_argument('--level', type=int, choices=[1, 2, 3])
+    parser.add_argument('--rows', type=int)
+    parser.add_argument('--columns', type=int)
+    parser.add_argument('--probability', type=float, help="probability of a cell being alive (levels 1 and 2)")
+    parser.add_argument('--probabilities', type=lambda text: [float(p) for p in text.split(',')],
+                        help="comma separated probability of each state (level 3)")
+    parser.add_argument('--states', type=lambda text: [int(state) for state in text.split(',')],
+                        help="comma separated states (level 3)")
+    parser.add_argument('--rules', help="JSON rules file (level 3)")
+    for bound in ['b1', 'b2', 'd1', 'd2']:
+        parser.add_argument(f'--{bound}', type=int)
+    parser.add_argument('--iterations', type=int)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output-dir', dest='output_dir')
+    parser.add_argument('--save-every', dest='save_every', type=int)
+    parser.add_argument('--trajectory', action='store_true', default=None,
+                        help="record every generation to trajectory.bin")
+    parser.add_argument('--keyframe-interval', dest='keyframe_interval', type=int)
+    parser.add_argument('--trace', action='store_true', default=None,
+                        help="record the time of every phase to trace.json")
+    parser.add_argument('--trace-every', dest='trace_every', type=int)
+    parser.add_argument('--checkpoint-every', dest='checkpoint_every', type=int,
+                        help="save checkpoint.npz every this many generations")
+    parser.add_argument('--resume', help="continue the run saved in this checkpoint file")
+    parser.add_argument('--statistics', action='store_true', default=None,
+                        help="record the population, births, deaths and changed cells to statistics.bin")
+    args = vars(parser.parse_args(argv))
+
+    if args.get('config'):
+        config = load_config(args.pop('config'))
+    elif args.get('resume'):
+        # Only the values given on the command line override the settings stored in the checkpoint
+        config = {}
+    else:
+        config = dict(DEFAULT_CONFIG)
+    config.update({key: value for key, value in args.items() if value is not None and key != 'config'})
+    run_batch(config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .life import update_life_state_1, update_life_state_2
+from .rules import (init_life_state_3, update_life_state_3, compile_rules, get_program_types,
+                    update_life_state_3_compiled)
+from .io import load_rules_from_json
+from .patterns import parse_rule_string
+from .bitpacked_life import pack_life_state, update_packed_life_state
+from .active_life import update_life_state_active
+from .sparse_life import life_state_to_cells, update_sparse_life_state
+from .neighborhoods import parse_ltl_rule, get_kernel_spectrum, update_life_state_kernel
+
+#settings used when neither the command line nor the caller gives a value
+DEFAULT_CONFIG = {
+    'engines': None,                 # names from ENGINES, all of them if None
+    'sizes': [32, 64, 128, 256, 512, 1024, 2048, 4096],
+    'densities': [0.1, 0.3, 0.5],    # fraction of alive (level 3: non-zero) cells at the start
+    'life_rules': ['B3/S23'],        # B/S rules for the level 2 engines
+    'rule_files': ['sample_rules.json'],  # JSON rules for the level 3 engines
+    'generations': 20,               # timed generations per case (fewer if max_seconds runs out)
+    'max_seconds': 10.0,             # stop timing a case after this long, once 3 generations are done
+    'memory_generations': 2,         # generations run again under tracemalloc to measure peak memory
+    'seed': 0,
+    'output': None,                  # JSON file for the results
+}
+
+#percentiles of the per-generation latency that are reported
+LATENCY_PERCENTILES = [50, 90, 99]
+
+
+#engine setups: each takes (life_state, rules) and returns a function that advances the board one generation
+def _setup_level_1(life_state, rules):
+    state = [life_state]
+
+    def step():
+        state[0] = update_life_state_1(state[0])
+    return step
+
+
+def _setup_level_2(life_state, rules):
+    buffers = [life_state.copy(), np.empty_like(life_state)]
+
+    def step():
+        update_life_state_2(buffers[0], rules['b1'], rules['b2'], rules['d1'], rules['d2'], out_life_state=buffers[1])
+        buffers.reverse()
+    return step
+
+
+def _setup_bitpacked(life_state, rules):
+    m = life_state.shape[1]
+    buffers = [pack_life_state(life_state), None]
+    buffers[1] = np.empty_like(buffers[0])
+
+    def step():
+        update_packed_life_state(buffers[0], m, rules['b1'], rules['b2'], rules['d1'], rules['d2'],
+                                 out_packed_state=buffers[1])
+        buffers.reverse()
+    return step
+
+
+def _setup_active(life_state, rules):
+    state = {'current': life_state.copy(), 'previous': None, 'changed': None}
+
+    def step():
+        new, state['changed'] = update_life_state_active(state['current'], state['changed'], rules['b1'], rules['b2'],
+                                                         rules['d1'], rules['d2'], out_life_state=state['previous'])
+        state['previous'], state['current'] = state['current'], new
+    return step
+
+
+def _setup_sparse(life_state, rules):
+    state = [life_state_to_cells(life_state)]
+
+    def step():
+        state[0] = update_sparse_life_state(state[0], rules['b1'], rules['b2'], rules['d1'], rules['d2'])
+    return step
+
+
+#helper function that makes a setup for the radius 5 Larger than Life rule (Bosco's rule) counted with method;
+#the neighborhood and bounds come from the rule string, not from the B/S rule of the case
+def _setup_larger_than_life(method):
+    def setup(life_state, rules):
+        ltl_rules = parse_ltl_rule('R5,C0,M1,S34..58,B34..45,NM')
+        buffers = [life_state.copy(), np.empty_like(life_state)]
+        counts = np.empty(life_state.shape, dtype=np.int64)
+        spectrum = get_kernel_spectrum(ltl_rules['kernel'], life_state.shape) if method == 'fft' else None
+
+        def step():
+            update_life_state_kernel(buffers[0], ltl_rules['kernel'], ltl_rules['b1'], ltl_rules['b2'],
+                                     ltl_rules['d1'], ltl_rules['d2'], out_life_state=buffers[1], method=method,
+                                     out_counts=counts, spectrum=spectrum)
+            buffers.reverse()
+        return step
+    return setup
+
+
+def _setup_level_3(life_state, rules):
+    state = [life_state]
+
+    def step():
+        state[0] = update_life_state_3(state[0], rules)
+    return step
+
+
+def _setup_level_3_compiled(life_state, rules):
+    program = compile_rules(rules)
+    neighbor_counts = np.empty((len(get_program_types(program)),) + life_state.shape, dtype=np.uint8)
+    one_hot = np.empty(life_state.shape, dtype=bool)
+    rng = np.random.default_rng(0)
+    buffers = [life_state.copy(), np.empty_like(life_state)]
+
+    def step():
+        np.copyto(buffers[1], buffers[0])
+        update_life_state_3_compiled(buffers[0], program, out_life_state=buffers[1], neighbor_counts=neighbor_counts,
+                                     rng=rng, one_hot=one_hot)
+        buffers.reverse()
+    return step
+
+
+#helper function that makes a setup that redraws the board every generation, to time the rendering alone
+def _setup_draw(draw):
+    def setup(life_state, rules):
+        # matplotlib is only loaded when a draw engine is benchmarked, and never opens a window
+        import matplotlib
+        matplotlib.use('Agg')
+        from . import renderer
+        colors = {0: 'gray', 1: 'green', 2: 'red'}
+        state = [life_state]
+
+        def step():
+            if draw == 3:
+                renderer.draw_life_state_3(state[0], colors)
+            else:
+                getattr(renderer, f'draw_life_state_{draw}')(state[0])
+        return step
+    return setup
+
+
+#every engine: (kind of board, largest number of cells it is benchmarked on, setup)
+#'life' engines get 0/1 boards and a level 2 rule, 'rules' engines get multi-state boards and a level 3 rule file
+ENGINES = {
+    'level1': ('life', None, _setup_level_1),
+    'level2': ('life', None, _setup_level_2),
+    'bitpacked': ('life', None, _setup_bitpacked),
+    'active': ('life', None, _setup_active),
+    'sparse': ('life', 1024 ** 2, _setup_sparse),
+    'ltl_direct': ('life', 1024 ** 2, _setup_larger_than_life('direct')),
+    'ltl_fft': ('life', None, _setup_larger_than_life('fft')),
+    'level3': ('rules', 128 ** 2, _setup_level_3),
+    'level3_compiled': ('rules', None, _setup_level_3_compiled),
+    'draw1': ('life', 2048 ** 2, _setup_draw(1)),
+    'draw2': ('life', 2048 ** 2, _setup_draw(2)),
+    'draw3': ('rules', 2048 ** 2, _setup_draw(3)),
+}
+
+
+def time_engine(step, generations, max_seconds=None):
+    """
+    Time one generation at a time.
+    IN:
+        step (function): advances the board one generation.
+        generations (int): number of generations to time (after one untimed warm-up generation).
+        max_seconds (float, optional): stop early once this much time is spent and at least 3 generations are timed.
+    OUT:
+        ndarray: the seconds taken by every timed generation.
+    """
+    step()
+    latencies = []
+    start = time.perf_counter()
+    for generation in range(generations):
+        before = time.perf_counter()
+        step()
+        latencies.append(time.perf_counter() - before)
+        if max_seconds is not None and generation >= 2 and time.perf_counter() - start > max_seconds:
+            break
+    return np.array(latencies)
+
+
+def measure_peak_memory(setup, life_state, rules, generations):
+    """
+    Peak memory allocated (numpy arrays included) while setting up an engine and running a few generations.
+    IN:
+        setup (function): the engine setup from ENGINES.
+        life_state (ndarray), rules: the board and the rules.
+        generations (int): number of generations to run.
+    OUT:
+        int: peak bytes, not counting the initial board.
+    """
+    tracemalloc.start()
+    try:
+        step = setup(life_state, rules)
+        for _ in range(generations):
+            step()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+#helper function that returns the initial board of a case
+def _initial_life_state(kind, size, density, states, seed):
+    np.random.seed(seed)
+    if kind == 'life':
+        return (np.random.rand(size, size) < density).astype(np.uint8)
+    # The non-zero states share the density equally
+    probabilities = [1 - density] + [density / (len(states) - 1)] * (len(states) - 1)
+    return init_life_state_3(size, size, probabilities, states)
+
+
+def run_case(engine, size, density, rules, rules_name, config):
+    """
+    Benchmark one engine on one board.
+    IN:
+        engine (str): name from ENGINES.
+        size (int): the board is size x size.
+        density (float): fraction of alive (non-zero) cells at the start.
+        rules (dict): level 2 bounds for 'life' engines, level 3 rules dict for 'rules' engines.
+        rules_name (str): how the rules are named in the results.
+        config (dict): the settings, see DEFAULT_CONFIG.
+    OUT:
+        dict: one row of the results.
+    """
+    kind, max_cells, setup = ENGINES[engine]
+    row = {'engine': engine, 'rows': size, 'columns': size, 'density': density, 'rules': rules_name}
+    if max_cells is not None and size * size > max_cells:
+        return {**row, 'skipped': f"larger than {max_cells} cells"}
+
+    states = sorted(rules) if kind == 'rules' else None
+    life_state = _initial_life_state(kind, size, density, states, config['seed'])
+    latencies = time_engine(setup(life_state, rules), config['generations'], config['max_seconds'])
+    peak_memory = measure_peak_memory(setup, life_state, rules, config['memory_generations'])
+
+    latencies_ms = 1000 * latencies
+    return {
+        **row,
+        'generations': len(latencies),
+        'total_seconds': float(latencies.sum()),
+        'cells_per_second': float(size * size * len(latencies) / latencies.sum()),
+        'latency_ms': {'mean': float(latencies_ms.mean()), 'max': float(latencies_ms.max()),
+                       **{f'p{q}': float(np.percentile(latencies_ms, q)) for q in LATENCY_PERCENTILES}},
+        'peak_memory_bytes': int(peak_memory),
+    }
+
+
+#helper function that describes the machine and the code version, so results from different runs can be compared
+def _get_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(config):
+    """
+    Benchmark every engine on every board size, density and rule set, printing one line per case.
+
+    IN:
+        config (dict): the settings, see DEFAULT_CONFIG.
+
+    OUT:
+        dict: {'metadata': ..., 'config': ..., 'results': [one dict per case]}, also written to config['output'].
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    engines = config['engines'] or list(ENGINES)
+    life_rules = [(rule, parse_rule_string(rule)) for rule in config['life_rules']]
+    rule_files = [(filename, {int(key): value for key, value in load_rules_from_json(filename).items()})
+                  for filename in config['rule_files']]
+
+    results = []
+    for engine in engines:
+        rule_sets = life_rules if ENGINES[engine][0] == 'life' else rule_files
+        for rules_name, rules in rule_sets:
+            for size in config['sizes']:
+                for density in config['densities']:
+                    result = run_case(engine, size, density, rules, rules_name, config)
+                    results.append(result)
+                    if 'skipped' in result:
+                        print(f"{engine:16} {size:5}^2 density {density:.2f} {rules_name}: skipped")
+                    else:
+                        print(f"{engine:16} {size:5}^2 density {density:.2f} {rules_name}: "
+                              f"{result['cells_per_second']:.3e} cells/s, "
+                              f"p50 {result['latency_ms']['p50']:.3f} ms, "
+                              f"peak {result['peak_memory_bytes'] / 1024 ** 2:.1f} MiB")
+
+    report = {'metadata': _get_metadata(), 'config': config, 'results': results}
+    if config['output']:
+        with open(config['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+    return report
+
+
+def compare_benchmarks(baseline, current, threshold=0.1):
+    """
+    Find the cases that got slower between two benchmark runs.
+    IN:
+        baseline, current (dict or str): results from run_benchmarks, or the JSON files they were written to.
+        threshold (float): report a case when its cells per second dropped by more than this fraction.
+    OUT:
+        list of dict: the slower cases with their old and new cells per second.
+    """
+    reports = []
+    for report in (baseline, current):
+        if isinstance(report, str):
+            with open(report, 'r') as file:
+                report = json.load(file)
+        reports.append(report)
+
+    key = lambda result: (result['engine'], result['rows'], result['columns'], result['density'], result['rules'])
+    old = {key(result): result for result in reports[0]['results'] if 'skipped' not in result}
+    slower = []
+    for result in reports[1]['results']:
+        if 'skipped' in result or key(result) not in old:
+            continue
+        before, after = old[key(result)]['cells_per_second'], result['cells_per_second']
+        if after < (1 - threshold) * before:
+            slower.append({'engine': result['engine'], 'rows': result['rows'], 'columns': result['columns'],
+                           'density': result['density'], 'rules': result['rules'],
+                           'baseline_cells_per_second': before, 'cells_per_second': after,
+                           'change': after / before - 1})
+    return slower
+
+
+def main(argv=None):
+    """
+    Command line entry point, e.g.
+        python -m game_of_life.benchmark --sizes 32,256,1024 --engines level2,bitpacked --output bench.json
+        python -m game_of_life.benchmark --output new.json --compare bench.json
+    With --compare, the cases that got more than --threshold slower are listed and the exit code is 1.
+    IN:
+        argv (list of str, optional): the arguments, defaults to sys.argv.
+    OUT:
+        int: the exit code.
+    """
+    split = lambda convert: (lambda text: [convert(value) for value in text.split(',')])
+    parser = argparse.ArgumentParser(description="Benchmark the Game of Life engines.")
+    parser.add_argument('--engines', type=split(str), help=f"comma separated, from {', '.join(ENGINES)}")
+    parser.add_argument('--sizes', type=split(int), help="comma separated board sides, e.g. 32,1024,4096")
+    parser.add_argument('--densities', type=split(float), help="comma separated, e.g. 0.1,0.3")
+    parser.add_argument('--life-rules', dest='life_rules', type=split(str), help="comma separated, e.g. B3/S23,B34/S34")
+    parser.add_argument('--rule-files', dest='rule_files', type=split(str), help="comma separated level 3 JSON files")
+    parser.add_argument('--generations', type=int)
+    parser.add_argument('--max-seconds', dest='max_seconds', type=float)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help="JSON file for the results")
+    parser.add_argument('--compare', help="earlier results to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.1, help="slowdown that counts as a regression")
+    args = vars(parser.parse_args(argv))
+
+    compare, threshold = args.pop('compare'), args.pop('threshold')
+    report = run_benchmarks({key: value for key, value in args.items() if value is not None})
+    if compare:
+        slower = compare_benchmarks(compare, report, threshold)
+        for case in slower:
+            print(f"slower: {case['engine']} {case['rows']}x{case['columns']} density {case['density']} "
+                  f"{case['rules']}: {case['change']:+.1%}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+import numpy as np
+
+#number of cells stored in one machine word
+WORD_BITS = 64
+
+_ONE = np.uint64(1)
+_TOP = np.uint64(WORD_BITS - 1)
+
+
+def pack_life_state(life_state):
+    """
+    Pack a 2D grid of cells into rows of 64-bit words (64 cells per word).
+    Bit k of word w in a row holds column w*64 + k; the unused bits of the last word are 0.
+
+    IN:
+        life_state (ndarray of shape (n, m)): grid where 0 is dead and anything else is alive.
+
+    OUT:
+        ndarray of shape (n, ceil(m/64)) and dtype uint64: the packed grid.
+    """
+    n, m = life_state.shape
+    num_words = -(-m // WORD_BITS)
+    #pad every row up to a whole number of words so each row packs into its own words
+    padded = np.zeros((n, num_words * WORD_BITS), dtype=bool)
+    padded[:, :m] = life_state != 0
+    packed_bytes = np.packbits(padded, axis=1, bitorder='little')
+    return packed_bytes.view('<u8').astype(np.uint64, copy=False)
+
+
+def unpack_life_state(packed_state, m):
+    """
+    Unpack a grid created by pack_life_state back into the ndarray used by the draw and save functions.
+
+    IN:
+        packed_state (ndarray of shape (n, ceil(m/64))): the packed grid.
+        m (int): number of columns of the original grid.
+
+    OUT:
+        ndarray of shape (n, m): bool grid where True represents alive, False represents dead.
+    """
+    packed_bytes = np.ascontiguousarray(packed_state, dtype='<u8').view(np.uint8)
+    return np.unpackbits(packed_bytes, axis=1, count=m, bitorder='little').astype(bool)
+
+
+#helper function that returns the mask of the valid (non padding) bits of every word in a row
+def _row_mask(m):
+    num_words = -(-m // WORD_BITS)
+    mask = np.full(num_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+    if m % WORD_BITS:
+        mask[-1] = (_ONE << np.uint64(m % WORD_BITS)) - _ONE
+    return mask
+
+
+#helper function that returns the grid shifted by one row, filling the new row with dead cells
+def _shift_rows(words, down):
+    shifted = np.zeros_like(words)
+    if down:
+        shifted[1:] = words[:-1]  # row i now holds row i-1 (the north neighbor)
+    else:
+        shifted[:-1] = words[1:]  # row i now holds row i+1 (the south neighbor)
+    return shifted
+
+
+#helper function that returns the west and east neighbors of every cell in each row
+def _shift_columns(words):
+    #column j-1 moves into bit j, carrying bit 63 of the previous word into bit 0
+    west = words << _ONE
+    west[:, 1:] |= words[:, :-1] >> _TOP
+    #column j+1 moves into bit j, carrying bit 0 of the next word into bit 63
+    east = words >> _ONE
+    east[:, :-1] |= words[:, 1:] << _TOP
+    return west, east
+
+
+#helper function that returns, for each possible neighbor count 0..8, which counts are in [low, high]
+def _count_window(low, high):
+    return [low <= k <= high for k in range(9)]
+
+
+def count_neighbors_packed(packed_state):
+    """
+    Count the alive neighbors of every cell with bitwise full adders, 64 cells per word operation.
+
+    IN:
+        packed_state (ndarray of shape (n, w)): the packed grid.
+
+    OUT:
+        list of 4 ndarrays of shape (n, w): the bits (1, 2, 4, 8) of every cell's neighbor count.
+    """
+    west, east = _shift_columns(packed_state)
+
+    # Full adder over (west, center, east) gives the 3-cell row sum used for the rows above and below
+    row_sum_1 = west ^ packed_state ^ east
+    row_carry_2 = (west & packed_state) | (east & (west ^ packed_state))
+    # Half adder over (west, east) gives the 2-cell sum of the cell's own row
+    mid_sum_1 = west ^ east
+    mid_carry_2 = west & east
+
+    north_sum_1 = _shift_rows(row_sum_1, down=True)
+    north_carry_2 = _shift_rows(row_carry_2, down=True)
+    south_sum_1 = _shift_rows(row_sum_1, down=False)
+    south_carry_2 = _shift_rows(row_carry_2, down=False)
+
+    # Ones column: full adder of the three row sums
+    bit_1 = north_sum_1 ^ mid_sum_1 ^ south_sum_1
+    carry_2 = (north_sum_1 & mid_sum_1) | (south_sum_1 & (north_sum_1 ^ mid_sum_1))
+
+    # Twos column: full adder of the three row carries, then a half adder with the carry from the ones
+    partial_2 = north_carry_2 ^ mid_carry_2 ^ south_carry_2
+    carry_4a = (north_carry_2 & mid_carry_2) | (south_carry_2 & (north_carry_2 ^ mid_carry_2))
+    bit_2 = partial_2 ^ carry_2
+    carry_4b = partial_2 & carry_2
+
+    # Fours and eights columns: at most 8 neighbors so two carries are enough
+    bit_4 = carry_4a ^ carry_4b
+    bit_8 = carry_4a & carry_4b
+
+    return [bit_1, bit_2, bit_4, bit_8]
+
+
+#helper function that returns the words where the neighbor count is one of the selected counts
+def _match_counts(count_bits, selected):
+    matched = np.zeros_like(count_bits[0])
+    for k, is_selected in enumerate(selected):
+        if not is_selected:
+            continue
+        term = np.full_like(count_bits[0], np.iinfo(np.uint64).max)
+        for bit_index, bit in enumerate(count_bits):
+            term &= bit if (k >> bit_index) & 1 else ~bit
+        matched |= term
+    return matched
+
+
+def update_packed_life_state(packed_state, m, b1=3, b2=3, d1=2, d2=3, out_packed_state=None):
+    """
+    Compute the next generation of a packed grid with the same custom bounds as update_life_state_2.
+
+    IN:
+        packed_state (ndarray of shape (n, ceil(m/64))): the current packed grid from pack_life_state.
+        m (int): number of columns of the grid.
+        b1 (int): Lower bound of the number of neighbors for a dead cell to come to life.
+        b2 (int): Upper bound of the number of neighbors for a dead cell to come to life.
+        d1 (int): Lower bound of the number of neighbors for an alive cell to continue being alive.
+        d2 (int): Upper bound of the number of neighbors for an alive cell to continue being alive.
+        out_packed_state (ndarray, optional): A pre-allocated packed array for storing the next state.
+                                              If None, a new array will be created.
+
+    OUT:
+        out_packed_state (ndarray of shape (n, ceil(m/64))): The next packed state of the grid.
+    """
+    if out_packed_state is None:
+        out_packed_state = np.empty_like(packed_state)
+
+    count_bits = count_neighbors_packed(packed_state)
+    born = _match_counts(count_bits, _count_window(b1, b2))
+    survives = _match_counts(count_bits, _count_window(d1, d2))
+
+    #dead cells use the birth window, alive cells use the survival window
+    np.bitwise_or(born & ~packed_state, survives & packed_state, out=out_packed_state)
+    #keep the padding bits past column m dead
+    out_packed_state &= _row_mask(m)
+    return out_packed_state
+
+
+def play_packed_life_state(life_state, num_iterations, b1=3, b2=3, d1=2, d2=3):
+    """
+    Run several generations on the packed grid and return the result in the usual ndarray format.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the initial state of the grid.
+        num_iterations (int): number of generations to run.
+        b1, b2, d1, d2 (int): the custom bounds, see update_packed_life_state.
+
+    OUT:
+        ndarray of shape (n, m): bool grid after num_iterations generations.
+    """
+    m = life_state.shape[1]
+    current = pack_life_state(life_state)
+    buffer = np.empty_like(current)
+    for iteration in range(num_iterations):
+        update_packed_life_state(current, m, b1, b2, d1, d2, out_packed_state=buffer)
+        # Swap the buffers instead of allocating a new grid every generation
+        current, buffer = buffer, current
+    return unpack_life_state(current, m)
@@ -0,0 +1,203 @@
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+#checkpoint files are .npz archives holding:
+#   life_state: the grid
+#   legacy_rng_keys: the key array of the global np.random state (used by init_life_state_1/2/3)
+#   metadata: JSON with the generation, the settings of the run (which include the rules) and the rest of the
+#             RNG states
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(filename, life_state, generation, config, rng=None, legacy_rng_state=None):
+    """
+    Save everything needed to continue a run exactly where it is. The file is written next to its final
+    name, flushed to disk and then renamed over it, so a crash while saving leaves the previous checkpoint intact.
+
+    IN:
+        filename (str): the checkpoint file (.npz).
+        life_state (ndarray of shape (n, m)): the grid at this generation.
+        generation (int): the generation of life_state.
+        config (dict): the settings of the run (see batch.DEFAULT_CONFIG), including the rules (b1/b2/d1/d2 or
+                       the level 3 rules dict). Must be JSON serializable.
+        rng (np.random.Generator, optional): the random generator used by the update function (level 3).
+        legacy_rng_state (tuple, optional): np.random.get_state(); the current global state if None.
+
+    OUT: None
+    """
+    if legacy_rng_state is None:
+        legacy_rng_state = np.random.get_state()
+    _write_checkpoint(filename, life_state, generation, config, rng.bit_generator.state if rng is not None else None,
+                      legacy_rng_state)
+
+
+#helper function that writes a checkpoint from the RNG states (which can be taken while the run goes on)
+def _write_checkpoint(filename, life_state, generation, config, rng_state, legacy_rng_state):
+    algorithm, keys, position, has_gauss, cached_gaussian = legacy_rng_state
+    metadata = {
+        'version': CHECKPOINT_VERSION,
+        'generation': generation,
+        'config': {key: value for key, value in config.items() if key != 'resume'},
+        'rng_state': rng_state,
+        'legacy_rng_state': [algorithm, int(position), int(has_gauss), float(cached_gaussian)],
+    }
+    temporary_filename = filename + '.tmp'
+    with open(temporary_filename, 'wb') as file:
+        np.savez(file, life_state=life_state, legacy_rng_keys=keys, metadata=np.array(json.dumps(metadata)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_filename, filename)
+
+
+def load_checkpoint(filename):
+    """
+    Read a checkpoint written by save_checkpoint or a checkpoint writer.
+    IN:
+        filename (str): the checkpoint file.
+    OUT:
+        dict: {'life_state', 'generation', 'config', 'rng_state', 'legacy_rng_state'}; pass it to restore_rng_state.
+    """
+    with np.load(filename, allow_pickle=False) as archive:
+        metadata = json.loads(str(archive['metadata']))
+        if metadata['version'] != CHECKPOINT_VERSION:
+            raise ValueError(f"{filename} is a version {metadata['version']} checkpoint, expected "
+                             f"{CHECKPOINT_VERSION}.")
+        algorithm, position, has_gauss, cached_gaussian = metadata['legacy_rng_state']
+        return {
+            'life_state': archive['life_state'],
+            'generation': metadata['generation'],
+            'config': metadata['config'],
+            'rng_state': metadata['rng_state'],
+            'legacy_rng_state': (algorithm, archive['legacy_rng_keys'], position, has_gauss, cached_gaussian),
+        }
+
+
+def restore_rng_state(checkpoint, rng=None):
+    """
+    Put the random generators back in the state they had when the checkpoint was taken.
+    IN:
+        checkpoint (dict): the checkpoint from load_checkpoint.
+        rng (np.random.Generator, optional): the generator of the update function, restored if the checkpoint has one.
+    OUT: None
+    """
+    np.random.set_state(checkpoint['legacy_rng_state'])
+    if rng is not None and checkpoint['rng_state'] is not None:
+        rng.bit_generator.state = checkpoint['rng_state']
+
+
+#helper function that is the body of the checkpoint writer thread
+def _write_checkpoints(writer):
+    while True:
+        item = writer['queue'].get()
+        if item is None:
+            break
+        life_state, generation, config, rng_state, legacy_rng_state = item
+        try:
+            _write_checkpoint(writer['filename'], life_state, generation, config, rng_state, legacy_rng_state)
+            writer['saved'] = generation
+        except Exception as error:
+            writer['error'] = error
+        writer['idle'].set()
+
+
+def create_checkpoint_writer(filename, life_state, every):
+    """
+    Create a background writer that saves a checkpoint every few generations while the run keeps stepping.
+    It keeps one spare grid: the grid of a checkpoint is handed to the writer thread as it is and the update
+    swaps in the spare instead, so taking a checkpoint costs a buffer swap, not a copy.
+
+    IN:
+        filename (str): the checkpoint file, replaced by every new checkpoint.
+        life_state (ndarray of shape (n, m)): a grid of the run, to allocate the spare like it.
+        every (int): take a checkpoint every this many generations.
+
+    OUT:
+        dict: the writer, pass it to update_checkpoint_writer every generation and to close_checkpoint_writer.
+    """
+    if every < 1:
+        raise ValueError("every must be at least 1.")
+    writer = {
+        'filename': filename,
+        'every': every,
+        'queue': queue.Queue(maxsize=1),
+        'spare': np.empty_like(life_state),
+        # the grid handed to the writer thread, until the run has swapped it out of its buffers
+        'held': None,
+        # the grid the writer thread is saving, it becomes the spare again once the thread is idle
+        'writing': None,
+        'idle': threading.Event(),
+        'due': False,
+        'saved': None,
+        'error': None,
+    }
+    writer['idle'].set()
+    writer['thread'] = threading.Thread(target=_write_checkpoints, args=(writer,), daemon=True)
+    writer['thread'].start()
+    return writer
+
+
+def update_checkpoint_writer(writer, life_state, free_life_state, generation, config, rng=None):
+    """
+    Call once per generation after swapping the buffers. Hands life_state to the writer thread when a checkpoint
+    is due (or delays it by a generation if the previous one is still being written), and makes sure the grid
+    the writer holds is never used as the output buffer.
+
+    IN:
+        writer (dict): the writer from create_checkpoint_writer.
+        life_state (ndarray of shape (n, m)): the grid of this generation, not changed until the next swap.
+        free_life_state (ndarray of shape (n, m)): the grid the next update will write into.
+        generation (int): the generation of life_state.
+        config (dict): the settings of the run, see save_checkpoint.
+        rng (np.random.Generator, optional): the random generator of the update function.
+
+    OUT:
+        ndarray of shape (n, m): the grid the next update should write into.
+    """
+    if writer['error'] is not None:
+        raise writer['error']
+    if free_life_state is writer['held']:
+        # The writer may still be reading this grid, so write into the spare instead
+        free_life_state, writer['spare'] = writer['spare'], None
+        writer['held'] = None
+    if writer['spare'] is None and writer['idle'].is_set():
+        # The last checkpoint is written, so its grid is the new spare
+        writer['spare'], writer['writing'] = writer['writing'], None
+
+    if generation % writer['every'] == 0:
+        writer['due'] = True
+    if writer['due'] and writer['spare'] is not None and writer['held'] is None and writer['idle'].is_set():
+        writer['due'] = False
+        writer['held'] = writer['writing'] = life_state
+        writer['idle'].clear()
+        rng_state = rng.bit_generator.state if rng is not None else None
+        writer['queue'].put((life_state, generation, config, rng_state, np.random.get_state()))
+    return free_life_state
+
+
+def close_checkpoint_writer(writer, life_state=None, generation=None, config=None, rng=None):
+    """
+    Wait for the checkpoint being written and stop the writer thread. If the final grid is given, it is saved too
+    (unless it was just saved), so a finished run can be continued for more generations later.
+
+    IN:
+        writer (dict): the writer from create_checkpoint_writer.
+        life_state (ndarray of shape (n, m), optional): the final grid.
+        generation (int, optional): the generation of life_state.
+        config (dict, optional): the settings of the run, see save_checkpoint.
+        rng (np.random.Generator, optional): the random generator of the update function.
+
+    OUT:
+        int or None: the generation of the last checkpoint written.
+    """
+    writer['queue'].put(None)
+    writer['thread'].join()
+    if writer['error'] is not None:
+        raise writer['error']
+    if life_state is not None and writer['saved'] != generation:
+        save_checkpoint(writer['filename'], life_state, generation, config, rng)
+        writer['saved'] = generation
+    return writer['saved']
@@ -0,0 +1,144 @@
+from collections import deque
+
+import numpy as np
+
+#longest period that is detected by default; older generations are forgotten
+DEFAULT_MAX_PERIOD = 1024
+
+
+#multipliers of the splitmix64 mixer the keys are derived from
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+#helper function that scrambles an array of uint64 into well spread 64-bit values (splitmix64)
+def _mix(values):
+    values = values ^ (values >> np.uint64(30))
+    values *= _MIX_1
+    values ^= values >> np.uint64(27)
+    values *= _MIX_2
+    values ^= values >> np.uint64(31)
+    return values
+
+
+def get_zobrist_keys(rows, cols, states, m, num_states=2, seed=0):
+    """
+    Pseudo-random 64-bit keys for Zobrist hashing: the fingerprint of a grid is the XOR of the keys of its cells,
+    so when a cell changes state the fingerprint is updated with two XORs instead of hashing the whole grid.
+    The keys are computed from a hash of (cell, state) when needed rather than stored in a table, so the
+    detector costs no memory per cell.
+
+    IN:
+        rows, cols (ndarray of int): the cells.
+        states (ndarray of int): the state of each cell.
+        m (int): number of columns of the grid.
+        num_states (int): number of cell states.
+        seed (int): seed of the keys, the same seed always gives the same fingerprints.
+
+    OUT:
+        ndarray of dtype uint64: the key of every cell in its state (state 0 has key 0, so empty cells cost nothing).
+    """
+    index = (np.asarray(rows, dtype=np.uint64) * np.uint64(m) + np.asarray(cols, dtype=np.uint64)) \
+        * np.uint64(num_states) + np.asarray(states, dtype=np.uint64)
+    offset = _mix(np.array([seed], dtype=np.uint64))[0]
+    keys = _mix((index + np.uint64(1)) * _GOLDEN + offset)
+    keys[np.asarray(states) == 0] = 0
+    return keys
+
+
+#helper function that returns the XOR of an array of keys as an int
+def _xor_keys(keys):
+    return int(np.bitwise_xor.reduce(keys, initial=np.uint64(0)))
+
+
+def hash_life_state(life_state, num_states=2, seed=0):
+    """
+    Fingerprint a whole grid from scratch.
+    IN:
+        life_state (ndarray of shape (n, m)): the grid.
+        num_states (int): number of cell states.
+        seed (int): seed of the keys, see get_zobrist_keys.
+    OUT:
+        int: the 64-bit fingerprint.
+    """
+    rows, cols = np.nonzero(life_state)
+    return _xor_keys(get_zobrist_keys(rows, cols, life_state[rows, cols], life_state.shape[1], num_states, seed))
+
+
+def create_cycle_detector(life_state, num_states=2, max_period=DEFAULT_MAX_PERIOD, seed=0):
+    """
+    Start watching a run for repeated generations (still lifes, oscillators, ...).
+
+    IN:
+        life_state (ndarray of shape (n, m)): generation 0.
+        num_states (int): number of cell states (2 for levels 1 and 2).
+        max_period (int): longest period that is detected; only the fingerprints of the last max_period
+                          generations are kept.
+        seed (int): seed of the Zobrist keys.
+
+    OUT:
+        dict: the detector. After a repeat, 'period' is its period and 'start' the first generation of the cycle.
+    """
+    key = hash_life_state(life_state, num_states, seed)
+    return {
+        'num_states': num_states,
+        'seed': seed,
+        'hash': key,
+        'generation': 0,
+        # fingerprint -> generation, for the last max_period generations
+        'seen': {key: 0},
+        'history': deque([key]),
+        'max_period': max_period,
+        'period': None,
+        'start': None,
+    }
+
+
+def update_cycle_detector(detector, life_state, previous_life_state=None, changed_cells=None):
+    """
+    Fingerprint the next generation from the cells that changed and check it against the recent generations.
+
+    IN:
+        detector (dict): the detector from create_cycle_detector.
+        life_state (ndarray of shape (n, m)): the new generation.
+        previous_life_state (ndarray of shape (n, m), optional): the generation before it.
+        changed_cells (tuple of two 1D ndarrays, optional): row and column indices of the cells that changed, e.g.
+                                                            from update_life_state_active. Found by comparing
+                                                            with previous_life_state if None.
+
+    OUT:
+        int or None: the period if this generation repeats an earlier one, otherwise None.
+    """
+    num_states, seed = detector['num_states'], detector['seed']
+    m = life_state.shape[1]
+    if changed_cells is None and previous_life_state is None:
+        # Without the previous generation the fingerprint has to be computed from scratch
+        key = hash_life_state(life_state, num_states, seed)
+    else:
+        if changed_cells is None:
+            changed_cells = np.nonzero(life_state != previous_life_state)
+        rows, cols = changed_cells
+        if num_states == 2:
+            # With two states a changed cell always flipped between 0 and 1, which XORs in its state 1 key
+            changes = get_zobrist_keys(rows, cols, np.ones(len(rows), dtype=np.uint8), m, num_states, seed)
+        elif previous_life_state is None:
+            raise ValueError("previous_life_state is needed to know the old states of the changed cells.")
+        else:
+            changes = get_zobrist_keys(rows, cols, previous_life_state[rows, cols], m, num_states, seed) \
+                ^ get_zobrist_keys(rows, cols, life_state[rows, cols], m, num_states, seed)
+        key = detector['hash'] ^ _xor_keys(changes)
+
+    detector['generation'] += 1
+    detector['hash'] = key
+    generation = detector['generation']
+    if key in detector['seen']:
+        detector['start'] = detector['seen'][key]
+        detector['period'] = generation - detector['start']
+        return detector['period']
+
+    detector['seen'][key] = generation
+    detector['history'].append(key)
+    if len(detector['history']) > detector['max_period']:
+        del detector['seen'][detector['history'].popleft()]
+    return None
@@ -0,0 +1,136 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from .rules import compile_rules, get_program_types, update_life_state_3_compiled
+
+
+#helper function that returns how many cells of each state every replica has
+def count_states(life_states, num_states):
+    """
+    Count the cells in each state for a stack of grids with a single bincount.
+
+    IN:
+        life_states (ndarray of shape (R, n, m)): the replicas.
+        num_states (int): states are 0 .. num_states - 1.
+
+    OUT:
+        ndarray of shape (R, num_states): number of cells of each state in each replica.
+    """
+    num_replicas = life_states.shape[0]
+    # Shift each replica's states into its own range so one bincount counts every replica
+    offsets = np.arange(num_replicas).reshape(-1, 1, 1) * num_states
+    counts = np.bincount((life_states + offsets).ravel(), minlength=num_replicas * num_states)
+    return counts.reshape(num_replicas, num_states)
+
+
+#helper function that returns the number of states used by the rules and the initial grid
+def get_num_states(program, initial_life_state):
+    states = [int(initial_life_state.max())]
+    for instruction in program:
+        states.append(instruction['state'])
+        states.extend(type for type, at_least, at_most in instruction['if'])
+        if 'turn_to' in instruction:
+            states.append(instruction['turn_to'])
+        else:
+            states.extend(instruction['choices'].tolist())
+    return max(states) + 1
+
+
+#helper function that runs one batch of replicas with its own random stream (also used by the worker processes)
+def _run_ensemble_batch(initial_life_states, program, num_iterations, num_states, seed_sequence):
+    rng = np.random.default_rng(seed_sequence)
+    num_replicas = initial_life_states.shape[0]
+    counts = np.empty((num_iterations + 1, num_replicas, num_states), dtype=np.int64)
+
+    # Two buffers for the whole stack of replicas, swapped every generation
+    current = initial_life_states.copy()
+    buffer = np.empty_like(current)
+    neighbor_counts = np.empty((len(get_program_types(program)),) + current.shape, dtype=np.uint8)
+    one_hot = np.empty(current.shape, dtype=bool)
+
+    counts[0] = count_states(current, num_states)
+    for iteration in range(num_iterations):
+        # Cells without a matching rule keep their state, so the output starts as a copy
+        np.copyto(buffer, current)
+        update_life_state_3_compiled(current, program, out_life_state=buffer,
+                                     neighbor_counts=neighbor_counts, rng=rng, one_hot=one_hot)
+        current, buffer = buffer, current
+        counts[iteration + 1] = count_states(current, num_states)
+    return counts
+
+
+def run_ensemble(initial_life_state, rules_dict, num_iterations, num_replicas=100, seed=None,
+                 num_workers=1, batch_size=64):
+    """
+    Run many replicas of a stochastic level-3 model and record how many cells are in each state every generation.
+
+    Replicas are stepped together as a (R, n, m) stack. They are split into batches of batch_size, each with
+    its own random stream spawned from seed, so the results only depend on seed and batch_size and not on
+    the number of workers.
+
+    IN:
+        initial_life_state (ndarray of shape (n, m) or (R, n, m)): the starting grid shared by every replica,
+                                                                   or one starting grid per replica.
+        rules_dict (dict): The dictionary containing the rules (as from load_rules_from_json).
+        num_iterations (int): number of generations to run.
+        num_replicas (int): number of replicas R (ignored when initial_life_state already has R grids).
+        seed (int, optional): seed of the random streams. If None, fresh entropy is used.
+        num_workers (int): number of worker processes. 1 runs every batch in this process.
+        batch_size (int): number of replicas stepped together in one batch.
+
+    OUT:
+        ndarray of shape (num_iterations + 1, R, num_states): counts[g, r, s] is the number of cells in state s
+                                                              in replica r at generation g.
+    """
+    program = compile_rules(rules_dict)
+    if initial_life_state.ndim == 2:
+        initial_life_state = np.broadcast_to(initial_life_state, (num_replicas,) + initial_life_state.shape)
+    num_replicas = initial_life_state.shape[0]
+    num_states = get_num_states(program, initial_life_state)
+
+    # Independent random streams, one per batch
+    starts = range(0, num_replicas, batch_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(starts))
+    batches = [initial_life_state[start:start + batch_size] for start in starts]
+
+    if num_workers == 1:
+        results = [_run_ensemble_batch(batch, program, num_iterations, num_states, seed_sequence)
+                   for batch, seed_sequence in zip(batches, seed_sequences)]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = list(executor.map(_run_ensemble_batch, batches, [program] * len(batches),
+                                        [num_iterations] * len(batches), [num_states] * len(batches),
+                                        seed_sequences))
+    return np.concatenate(results, axis=1)
+
+
+def summarize_ensemble(counts, infected_state):
+    """
+    Summarize an ensemble run around one state of interest (e.g. the infected state of an SIR model).
+
+    IN:
+        counts (ndarray of shape (G + 1, R, num_states)): the state counts from run_ensemble.
+        infected_state (int): the state to summarize.
+
+    OUT:
+        dict with, per replica, the peak number of infected cells, the generation of the peak and the first
+        generation with no infected cells (-1 if it never happens), plus their mean and spread over the replicas.
+    """
+    infected = counts[:, :, infected_state]
+    peak_infected = infected.max(axis=0)
+    peak_generation = infected.argmax(axis=0)
+    extinct = infected == 0
+    went_extinct = extinct.any(axis=0)
+    extinction_generation = np.where(went_extinct, extinct.argmax(axis=0), -1)
+
+    return {
+        'peak_infected': peak_infected,
+        'peak_generation': peak_generation,
+        'extinction_generation': extinction_generation,
+        'mean_peak_infected': float(peak_infected.mean()),
+        'std_peak_infected': float(peak_infected.std()),
+        'mean_peak_generation': float(peak_generation.mean()),
+        'extinct_fraction': float(went_extinct.mean()),
+        'mean_extinction_generation': float(extinction_generation[went_extinct].mean()) if went_extinct.any() else float('nan'),
+        'mean_counts': counts.mean(axis=1),
+    }
@@ -0,0 +1,379 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .life import init_life_state_1, update_life_state_1
+from .io import save_to_csv
+
+#tkinter is imported inside the functions, so importing the package never needs a display
+
+#frames per second shown (and generations per second simulated) when the window opens
+DEFAULT_FPS = 2
+MAX_FPS = 60
+#frames waiting for the window; when it falls behind, the oldest frame is dropped instead of slowing the simulation
+FRAME_QUEUE_SIZE = 2
+#largest side of the board on screen in pixels
+MAX_CANVAS_SIZE = 600
+#colors of dead and alive cells (RGB): light gray and black, the same as draw_life_state_1
+CELL_COLORS = np.array([[211, 211, 211], [0, 0, 0]], dtype=np.uint8)
+
+
+def create_simulation(life_state, num_iterations, fps=DEFAULT_FPS, queue_size=FRAME_QUEUE_SIZE):
+    """
+    Create a simulation that runs in its own thread and hands every generation to the window through a small
+    queue, so the window never waits for the simulation and the simulation never waits for the window.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the initial grid.
+        num_iterations (int): number of generations to run.
+        fps (float): generations per second while running.
+        queue_size (int): number of frames that can wait for the window before the oldest is dropped.
+
+    OUT:
+        dict: the simulation, pass it to start_simulation, pause_simulation, step_simulation and stop_simulation.
+    """
+    simulation = {
+        'life_state': life_state,
+        'generation': 0,
+        'num_iterations': num_iterations,
+        'fps': fps,
+        # (generation, grid) of the generations the window has not shown yet
+        'frames': queue.Queue(maxsize=queue_size),
+        'dropped': 0,
+        'running': threading.Event(),
+        'stopped': threading.Event(),
+        # set whenever a button is pressed, so a waiting simulation reacts at once
+        'wake': threading.Event(),
+        'steps': threading.Semaphore(0),
+        'thread': None,
+    }
+    simulation['frames'].put((0, life_state))
+    simulation['thread'] = threading.Thread(target=_run_simulation, args=(simulation,), daemon=True)
+    simulation['thread'].start()
+    return simulation
+
+
+#helper function that hands a frame to the window, dropping the oldest waiting frame if the window is behind
+def _put_frame(simulation, frame):
+    frames = simulation['frames']
+    try:
+        frames.put_nowait(frame)
+    except queue.Full:
+        try:
+            frames.get_nowait()
+            simulation['dropped'] += 1
+        except queue.Empty:
+            pass
+        # This thread is the only one adding frames, so there is room now
+        frames.put_nowait(frame)
+
+
+#helper function that is the body of the simulation thread
+def _run_simulation(simulation):
+    next_time = time.perf_counter()
+    while not simulation['stopped'].is_set() and simulation['generation'] < simulation['num_iterations']:
+        if simulation['running'].is_set():
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                # Sleep until the next generation is due, but wake up for pause and stop
+                simulation['wake'].wait(delay)
+                simulation['wake'].clear()
+                continue
+            # Do not try to catch up after a pause or a slow generation
+            next_time = max(next_time + 1 / simulation['fps'], time.perf_counter())
+        elif not simulation['steps'].acquire(blocking=False):
+            simulation['wake'].wait()
+            simulation['wake'].clear()
+            next_time = time.perf_counter()
+            continue
+
+        simulation['life_state'] = update_life_state_1(simulation['life_state'])
+        simulation['generation'] += 1
+        _put_frame(simulation, (simulation['generation'], simulation['life_state']))
+
+
+def start_simulation(simulation):
+    """
+    Run the generations one after the other at simulation['fps'].
+    IN:
+        simulation (dict): the simulation from create_simulation.
+    OUT: None
+    """
+    simulation['running'].set()
+    simulation['wake'].set()
+
+
+def pause_simulation(simulation):
+    """
+    Stop after the current generation until start_simulation or step_simulation is called.
+    IN:
+        simulation (dict): the simulation from create_simulation.
+    OUT: None
+    """
+    simulation['running'].clear()
+    simulation['wake'].set()
+
+
+def step_simulation(simulation):
+    """
+    Pause the simulation and run exactly one more generation.
+    IN:
+        simulation (dict): the simulation from create_simulation.
+    OUT: None
+    """
+    pause_simulation(simulation)
+    simulation['steps'].release()
+    simulation['wake'].set()
+
+
+def set_simulation_fps(simulation, fps):
+    """
+    Change the number of generations per second.
+    IN:
+        simulation (dict): the simulation from create_simulation.
+        fps (float): generations per second, more than 0.
+    OUT: None
+    """
+    if fps <= 0:
+        raise ValueError("fps must be more than 0.")
+    simulation['fps'] = fps
+    simulation['wake'].set()
+
+
+def stop_simulation(simulation):
+    """
+    End the simulation thread and wait for it.
+    IN:
+        simulation (dict): the simulation from create_simulation.
+    OUT: None
+    """
+    simulation['stopped'].set()
+    simulation['wake'].set()
+    simulation['thread'].join()
+
+
+def is_simulation_finished(simulation):
+    """
+    IN:
+        simulation (dict): the simulation from create_simulation.
+    OUT:
+        bool: whether the simulation thread has ended and the window has taken every frame.
+    """
+    return not simulation['thread'].is_alive() and simulation['frames'].empty()
+
+
+def get_ppm_image(life_state, max_size=MAX_CANVAS_SIZE, colors=CELL_COLORS):
+    """
+    Turn a grid into a binary PPM image that Tk can load in one call, with every cell a square of pixels.
+    Boards with more cells than max_size pixels are shown by every k-th row and column.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the grid.
+        max_size (int): largest side of the image in pixels.
+        colors (ndarray of shape (num_states, 3)): RGB color of every cell state.
+
+    OUT:
+        bytes: the PPM image.
+    """
+    n, m = life_state.shape
+    skip = -(-max(n, m) // max_size)
+    if skip > 1:
+        life_state = life_state[::skip, ::skip]
+    cell_size = max(1, max_size // max(life_state.shape))
+    pixels = colors[life_state.astype(np.intp)]
+    pixels = np.repeat(np.repeat(pixels, cell_size, axis=0), cell_size, axis=1)
+    height, width = pixels.shape[:2]
+    return f"P6 {width} {height} 255 ".encode() + pixels.tobytes()
+
+
+#helper function that takes the newest frame from the simulation and draws it, then schedules itself again
+def _show_frames(window):
+    simulation = window['simulation']
+    if simulation is None:
+        return
+
+    # Only the newest waiting frame is drawn, the older ones are skipped
+    frame = None
+    while True:
+        try:
+            newest = simulation['frames'].get_nowait()
+        except queue.Empty:
+            break
+        if frame is not None:
+            window['skipped'] += 1
+        frame = newest
+
+    if frame is not None:
+        generation, life_state = frame
+        # Reload the one image the canvas shows instead of adding canvas items every generation
+        window['image'].configure(data=get_ppm_image(life_state), format='PPM')
+        window['canvas'].configure(width=window['image'].width(), height=window['image'].height())
+        now = time.perf_counter()
+        window['shown'].append(now)
+        while window['shown'][0] < now - 1:
+            window['shown'].popleft()
+        window['status'].configure(text=f"Generation {generation}/{simulation['num_iterations']}   "
+                                        f"{len(window['shown'])} fps   "
+                                        f"{simulation['dropped'] + window['skipped']} frames dropped")
+
+    if is_simulation_finished(simulation):
+        window['simulation'] = None
+        _ask_to_save(simulation['life_state'])
+        return
+    window['root'].after(max(1, int(1000 / window['fps'].get())), _show_frames, window)
+
+
+#helper function that asks the user whether to save the final state
+def _ask_to_save(life_state):
+    from tkinter import messagebox
+    from tkinter import simpledialog
+
+    save_final_state = messagebox.askyesno("Save State", "Would you like to save the final state to a CSV file?")
+    if save_final_state:
+        filename = simpledialog.askstring("Save File", "Enter a filename (e.g., final_state.csv):")
+        if filename:
+            save_to_csv(life_state, filename)
+            messagebox.showinfo("Saved", f"Final state saved as {filename}.")
+
+
+#helper function that creates a paused simulation from the values typed into the window, returns whether it worked
+def _create_game_of_life(window):
+    from tkinter import messagebox
+
+    try:
+        # Get the grid size and probability from the user inputs
+        n = int(window['rows'].get())
+        m = int(window['columns'].get())
+        p = float(window['probability'].get())
+        num_iterations = int(window['iterations'].get())
+
+        if not (0 <= p <= 1):
+            raise ValueError("Probability must be between 0 and 1.")
+
+        # Initialize the game grid and run it in the background
+        life_state = init_life_state_1(n, m, p)
+        window['skipped'] = 0
+        window['shown'].clear()
+        window['simulation'] = create_simulation(life_state, num_iterations, window['fps'].get())
+        _show_frames(window)
+        return True
+
+    except ValueError as e:
+        messagebox.showerror("Invalid Input", f"Error: {e}")
+    except Exception as e:
+        messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+    return False
+
+
+# Function to start the Game of Life simulation based on the inputs from the user interface
+def start_game_of_life(window):
+    """
+    Start a new run with the values typed into the window, or resume the paused one. The generations are
+    computed in a background thread and drawn by the Tk event loop, so the window stays responsive.
+
+    IN:
+        window (dict): the widgets of the window, see run_gui.
+
+    OUT: None
+    """
+    if window['simulation'] is not None or _create_game_of_life(window):
+        start_simulation(window['simulation'])
+
+
+#helper function for the Pause button
+def _pause_game_of_life(window):
+    if window['simulation'] is not None:
+        pause_simulation(window['simulation'])
+
+
+#helper function for the Step button: creates a paused run if there is none yet, then runs one generation
+def _step_game_of_life(window):
+    if window['simulation'] is not None or _create_game_of_life(window):
+        step_simulation(window['simulation'])
+
+
+#helper function for the speed slider, the new speed applies to the running simulation straight away
+def _set_game_of_life_fps(window, value):
+    if window['simulation'] is not None:
+        set_simulation_fps(window['simulation'], float(value))
+
+
+#helper function that stops the simulation thread and closes the window
+def _close_window(window):
+    if window['simulation'] is not None:
+        stop_simulation(window['simulation'])
+    window['root'].destroy()
+
+
+def run_gui():
+    """
+    Open the Tkinter window for the basic Game of Life and run its event loop.
+    IN: None
+    OUT: None
+    """
+    import tkinter as tk
+
+    # Main Tkinter window
+    root = tk.Tk()
+    root.title("Conway's Game of Life")
+    window = {'root': root, 'simulation': None, 'skipped': 0, 'shown': deque()}
+
+    # Create labels, entry fields, and buttons
+    label_rows = tk.Label(root, text="Number of rows:")
+    label_rows.grid(row=0, column=0, padx=10, pady=5)
+
+    window['rows'] = tk.Entry(root)
+    window['rows'].grid(row=0, column=1, padx=10, pady=5)
+
+    label_columns = tk.Label(root, text="Number of columns:")
+    label_columns.grid(row=1, column=0, padx=10, pady=5)
+
+    window['columns'] = tk.Entry(root)
+    window['columns'].grid(row=1, column=1, padx=10, pady=5)
+
+    label_probability = tk.Label(root, text="Probability of cell being alive (0-1):")
+    label_probability.grid(row=2, column=0, padx=10, pady=5)
+
+    window['probability'] = tk.Entry(root)
+    window['probability'].grid(row=2, column=1, padx=10, pady=5)
+
+    label_iterations = tk.Label(root, text="Number of iterations:")
+    label_iterations.grid(row=3, column=0, padx=10, pady=5)
+
+    window['iterations'] = tk.Entry(root)
+    window['iterations'].grid(row=3, column=1, padx=10, pady=5)
+
+    label_fps = tk.Label(root, text="Generations per second:")
+    label_fps.grid(row=4, column=0, padx=10, pady=5)
+
+    window['fps'] = tk.Scale(root, from_=1, to=MAX_FPS, orient=tk.HORIZONTAL,
+                             command=lambda value: _set_game_of_life_fps(window, value))
+    window['fps'].set(DEFAULT_FPS)
+    window['fps'].grid(row=4, column=1, padx=10, pady=5)
+
+    # Start, pause and step buttons
+    buttons = tk.Frame(root)
+    buttons.grid(row=5, column=0, columnspan=2, padx=10, pady=20)
+    tk.Button(buttons, text="Start", command=lambda: start_game_of_life(window)).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Pause", command=lambda: _pause_game_of_life(window)).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Step", command=lambda: _step_game_of_life(window)).pack(side=tk.LEFT, padx=5)
+
+    # Exit button to close the application
+    exit_button = tk.Button(root, text="Exit", command=lambda: _close_window(window))
+    exit_button.grid(row=6, column=0, columnspan=2, padx=10, pady=5)
+    root.protocol("WM_DELETE_WINDOW", lambda: _close_window(window))
+
+    # The board is one image on a canvas, replaced in place every frame
+    window['image'] = tk.PhotoImage(width=1, height=1)
+    window['canvas'] = tk.Canvas(root, width=MAX_CANVAS_SIZE, height=MAX_CANVAS_SIZE, highlightthickness=0)
+    window['canvas'].create_image(0, 0, image=window['image'], anchor=tk.NW)
+    window['canvas'].grid(row=0, column=2, rowspan=8, padx=10, pady=10)
+
+    window['status'] = tk.Label(root, text="")
+    window['status'].grid(row=7, column=0, columnspan=2, padx=10, pady=5)
+
+    # Run the Tkinter event loop
+    root.mainloop()
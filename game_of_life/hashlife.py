@@ -0,0 +1,318 @@
+import numpy as np
+from collections import OrderedDict
+
+#largest level whose cells are cached as a small ndarray on the node (16x16 cells)
+_BLOCK_LEVEL = 4
+
+#default limits, checked between jumps: past them old results are evicted and the node table is rebuilt
+_max_cached_results = 2**20
+_max_nodes = 2**22
+
+
+class _Node:
+    """
+    Canonical quadtree node of size 2**level x 2**level.
+    Two nodes with the same children are always the same object, so nodes can be compared and cached by id.
+    """
+    __slots__ = ('level', 'population', 'nw', 'ne', 'sw', 'se', 'block')
+
+    def __init__(self, level, population, nw=None, ne=None, sw=None, se=None):
+        self.level = level
+        self.population = population
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.block = None
+
+
+#the two leaves (single cells) every tree is built from
+_DEAD = _Node(0, 0)
+_ALIVE = _Node(0, 1)
+
+#table of canonical nodes keyed by the ids of their children
+_nodes = {}
+#memoized successors keyed by (id(node), j), holding (node, result) so the id stays valid
+_results = OrderedDict()
+#canonical empty node of each level
+_empty_nodes = [_DEAD]
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'collections': 0}
+
+
+#helper function that returns the canonical node with the given four quadrants
+def _join(nw, ne, sw, se):
+    key = (id(nw), id(ne), id(sw), id(se))
+    node = _nodes.get(key)
+    if node is None:
+        population = nw.population + ne.population + sw.population + se.population
+        node = _Node(nw.level + 1, population, nw, ne, sw, se)
+        _nodes[key] = node
+    return node
+
+
+#helper function that returns the canonical empty node of a given level
+def _empty(level):
+    while len(_empty_nodes) <= level:
+        e = _empty_nodes[-1]
+        _empty_nodes.append(_join(e, e, e, e))
+    return _empty_nodes[level]
+
+
+#helper function that returns the cells of a small node as an ndarray of 0/1
+def _block(node):
+    if node.block is not None:
+        return node.block
+    if node.level == 0:
+        block = np.array([[node.population]], dtype=np.uint8)
+    else:
+        block = np.block([[_block(node.nw), _block(node.ne)], [_block(node.sw), _block(node.se)]])
+    if node.level <= _BLOCK_LEVEL:
+        node.block = block
+    return block
+
+
+#helper function that returns the centered 2x2 node of a 4x4 node one generation later (Conway rules)
+def _step_level_2(node):
+    cells = _block(node).tolist()
+    leaves = []
+    for i in (1, 2):
+        for j in (1, 2):
+            alive_neighbors = sum(cells[i + di][j + dj] for di in (-1, 0, 1) for dj in (-1, 0, 1)) - cells[i][j]
+            if alive_neighbors == 3 or (cells[i][j] and alive_neighbors == 2):
+                leaves.append(_ALIVE)
+            else:
+                leaves.append(_DEAD)
+    return _join(*leaves)
+
+
+#helper function that returns the centered node of half the size, 2**j generations later (j <= level - 2)
+def _successor(node, j):
+    if node.population == 0:
+        return _empty(node.level - 1)
+    j = min(j, node.level - 2)
+
+    key = (id(node), j)
+    cached = _results.get(key)
+    if cached is not None:
+        _stats['hits'] += 1
+        _results.move_to_end(key)
+        return cached[1]
+    _stats['misses'] += 1
+
+    if node.level == 2:
+        result = _step_level_2(node)
+    else:
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        # The 9 overlapping sub-squares of half the size, in row order
+        n00 = nw
+        n01 = _join(nw.ne, ne.nw, nw.se, ne.sw)
+        n02 = ne
+        n10 = _join(nw.sw, nw.se, sw.nw, sw.ne)
+        n11 = _join(nw.se, ne.sw, sw.ne, se.nw)
+        n12 = _join(ne.sw, ne.se, se.nw, se.ne)
+        n20 = sw
+        n21 = _join(sw.ne, se.nw, sw.se, se.sw)
+        n22 = se
+        c00, c01, c02 = _successor(n00, j), _successor(n01, j), _successor(n02, j)
+        c10, c11, c12 = _successor(n10, j), _successor(n11, j), _successor(n12, j)
+        c20, c21, c22 = _successor(n20, j), _successor(n21, j), _successor(n22, j)
+
+        if j < node.level - 2:
+            # The sub-squares are already 2**j generations ahead, only keep their centers
+            result = _join(
+                _join(c00.se, c01.sw, c10.ne, c11.nw),
+                _join(c01.se, c02.sw, c11.ne, c12.nw),
+                _join(c10.se, c11.sw, c20.ne, c21.nw),
+                _join(c11.se, c12.sw, c21.ne, c22.nw),
+            )
+        else:
+            # Full speed: advance a second time to get 2**(level-2) generations in total
+            result = _join(
+                _successor(_join(c00, c01, c10, c11), j),
+                _successor(_join(c01, c02, c11, c12), j),
+                _successor(_join(c10, c11, c20, c21), j),
+                _successor(_join(c11, c12, c21, c22), j),
+            )
+
+    # Never evict here: the results of the jump in progress are reused many times before it ends
+    _results[key] = (node, result)
+    return result
+
+
+#helper function that returns the node centered in a node of twice the size
+def _expand(node):
+    e = _empty(node.level - 1)
+    return _join(
+        _join(e, e, e, node.nw),
+        _join(e, e, node.ne, e),
+        _join(e, node.sw, e, e),
+        _join(node.se, e, e, e),
+    )
+
+
+#helper function that returns the population of the central quarter-width square of a node
+def _inner_population(node):
+    return (node.nw.se.se.population + node.ne.sw.sw.population
+            + node.sw.ne.ne.population + node.se.nw.nw.population)
+
+
+#helper function that trims the caches between jumps, when no result is in use by a recursion
+def _collect_garbage():
+    while len(_results) > _max_cached_results:
+        _results.popitem(last=False)
+        _stats['evictions'] += 1
+    if len(_nodes) > _max_nodes:
+        _nodes.clear()
+        _results.clear()
+        del _empty_nodes[1:]
+        _stats['collections'] += 1
+
+
+def life_state_to_node(life_state):
+    """
+    Convert a grid into a canonical quadtree whose top-left corner is cell (0, 0) of the grid.
+
+    IN:
+        life_state (ndarray of shape (n, m)): grid where 0 is dead and anything else is alive.
+
+    OUT:
+        the root node of the quadtree (at least 8x8 cells).
+    """
+    n, m = life_state.shape
+    level = max(3, int(np.ceil(np.log2(max(n, m, 1)))))
+    size = 1 << level
+    indices = np.zeros((size, size), dtype=np.intp)
+    indices[:n, :m] = life_state != 0
+    table = [_DEAD, _ALIVE]
+    # Build the tree bottom-up, creating one node per distinct combination of children at each level
+    for _ in range(level):
+        quadrants = np.stack([indices[0::2, 0::2], indices[0::2, 1::2],
+                              indices[1::2, 0::2], indices[1::2, 1::2]], axis=-1)
+        unique, inverse = np.unique(quadrants.reshape(-1, 4), axis=0, return_inverse=True)
+        table = [_join(table[a], table[b], table[c], table[d]) for a, b, c, d in unique.tolist()]
+        indices = inverse.reshape(quadrants.shape[:2])
+    return table[indices[0, 0]]
+
+
+#helper function that writes the part of a node that falls inside the grid
+def _write_node(node, row, col, out_life_state):
+    n, m = out_life_state.shape
+    size = 1 << node.level
+    if node.population == 0 or row >= n or col >= m or row + size <= 0 or col + size <= 0:
+        return
+    if node.level <= _BLOCK_LEVEL:
+        block = _block(node)
+        top, left = max(row, 0), max(col, 0)
+        bottom, right = min(row + size, n), min(col + size, m)
+        out_life_state[top:bottom, left:right] = block[top - row:bottom - row, left - col:right - col]
+        return
+    half = size // 2
+    _write_node(node.nw, row, col, out_life_state)
+    _write_node(node.ne, row, col + half, out_life_state)
+    _write_node(node.sw, row + half, col, out_life_state)
+    _write_node(node.se, row + half, col + half, out_life_state)
+
+
+def node_to_life_state(node, n, m, row=0, col=0, out_life_state=None):
+    """
+    Convert a quadtree back into the grid format used by the draw and save functions.
+
+    IN:
+        node: the root node of the quadtree.
+        n (int): number of rows of the grid.
+        m (int): number of columns of the grid.
+        row, col (int): position of the node's top-left corner relative to cell (0, 0) of the grid.
+        out_life_state (ndarray of shape (n, m), optional): a pre-allocated array for the cells.
+                                                            If None, a new bool array will be created.
+
+    OUT:
+        out_life_state (ndarray of shape (n, m)): the cells of the node inside the grid, cells outside are dropped.
+    """
+    if out_life_state is None:
+        out_life_state = np.zeros((n, m), dtype=bool)
+    else:
+        out_life_state[...] = 0
+    _write_node(node, row, col, out_life_state)
+    return out_life_state
+
+
+def advance(life_state, generations):
+    """
+    Jump a Conway board ahead by any number of generations using HashLife.
+
+    The board is evolved on an unbounded plane and then cut back to the original (n, m) window,
+    so the result matches update_life_state_1 as long as the pattern never reaches the grid border.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the current state of the grid.
+        generations (int): number of generations to advance.
+
+    OUT:
+        ndarray of shape (n, m): the state of the grid after the given number of generations.
+    """
+    n, m = life_state.shape
+    node = life_state_to_node(life_state)
+    row, col = 0, 0
+    # Advance by 2**j generations for every bit j set in the number of generations
+    for j in range(int(generations).bit_length()):
+        if not (generations >> j) & 1:
+            continue
+        # Pad until the pattern sits in the central quarter and the node is big enough for the jump
+        while node.level < j + 3 or _inner_population(node) != node.population:
+            half = 1 << (node.level - 1)
+            node = _expand(node)
+            row, col = row - half, col - half
+        quarter = 1 << (node.level - 2)
+        node = _successor(node, j)
+        row, col = row + quarter, col + quarter
+        _collect_garbage()
+    return node_to_life_state(node, n, m, row, col, np.zeros_like(life_state))
+
+
+def get_cache_stats():
+    """
+    Return statistics about the HashLife caches, to help size memory.
+
+    IN: None
+    OUT:
+        dict with the number of canonical nodes, cached results, cache hits, misses, hit rate,
+        evicted results and node table rebuilds.
+    """
+    lookups = _stats['hits'] + _stats['misses']
+    return {
+        'nodes': len(_nodes),
+        'cached_results': len(_results),
+        'hits': _stats['hits'],
+        'misses': _stats['misses'],
+        'hit_rate': _stats['hits'] / lookups if lookups else 0.0,
+        'evictions': _stats['evictions'],
+        'collections': _stats['collections'],
+    }
+
+
+def set_cache_limits(max_cached_results=None, max_nodes=None):
+    """
+    Change how many results and nodes are kept before evicting. Both are soft targets, not hard caps: they are
+    only enforced between the power-of-two jumps of advance, so a single jump can go over them while it runs.
+
+    IN:
+        max_cached_results (int, optional): results kept in the memo cache; the least recently used are evicted
+                                             after each jump.
+        max_nodes (int, optional): canonical nodes kept; past this the tables are rebuilt after each jump.
+    OUT: None
+    """
+    global _max_cached_results, _max_nodes
+    if max_cached_results is not None:
+        _max_cached_results = max_cached_results
+    if max_nodes is not None:
+        _max_nodes = max_nodes
+
+
+def clear_cache():
+    """
+    Drop every cached node and result and reset the statistics.
+    IN: None
+    OUT: None
+    """
+    _nodes.clear()
+    _results.clear()
+    del _empty_nodes[1:]
+    for key in _stats:
+        _stats[key] = 0
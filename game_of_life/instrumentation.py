@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+#the recorder that phase() and end_generation() write to, None when instrumentation is off
+_recorder = None
+#returned by phase() when nothing is recorded, so an instrumented function costs one call when instrumentation is off
+_NO_PHASE = nullcontext()
+
+
+def create_recorder(sample_every=1, max_events=1_000_000):
+    """
+    Create a recorder for the time spent in every phase (neighbor counting, rules, sampling, drawing, saving, ...)
+    of every generation, plus the population and the number of changed cells.
+
+    IN:
+        sample_every (int): only record every this many generations, to keep the overhead low on long runs.
+        max_events (int): stop storing phase timings after this many (hooks are still called).
+
+    OUT:
+        dict: the recorder, pass it to start_recording.
+    """
+    return {
+        'sample_every': sample_every,
+        'max_events': max_events,
+        'generation': 0,
+        'start_ns': time.perf_counter_ns(),
+        # (name, generation, start_ns, duration_ns, thread id) of every recorded phase
+        'events': [],
+        # (generation, time_ns, population, changed cells) at the end of every recorded generation
+        'generations': [],
+        'hooks': [],
+        'dropped_events': 0,
+    }
+
+
+def start_recording(recorder):
+    """
+    Make recorder the active recorder: from now on the instrumented update, draw and save functions time themselves.
+    IN:
+        recorder (dict): the recorder from create_recorder.
+    OUT: None
+    """
+    global _recorder
+    _recorder = recorder
+
+
+def stop_recording():
+    """
+    Turn instrumentation off.
+    IN: None
+    OUT:
+        dict or None: the recorder that was active.
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+def get_recorder():
+    """
+    IN: None
+    OUT:
+        dict or None: the active recorder.
+    """
+    return _recorder
+
+
+def add_hook(recorder, hook):
+    """
+    Call hook(event) for every recorded phase and generation, e.g. to print or stream timings while the run goes.
+    Phase events are {'type': 'phase', 'name', 'generation', 'start_ns', 'duration_ns'} and generation events are
+    {'type': 'generation', 'generation', 'time_ns', 'population', 'changed_cells'}.
+
+    IN:
+        recorder (dict): the recorder from create_recorder.
+        hook (function): called with one event dict at a time.
+
+    OUT: None
+    """
+    recorder['hooks'].append(hook)
+
+
+#helper function that returns whether the current generation of the recorder is sampled
+def _is_sampled(recorder):
+    return recorder['generation'] % recorder['sample_every'] == 0
+
+
+@contextmanager
+def _timed_phase(recorder, name):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter_ns() - start
+        if len(recorder['events']) < recorder['max_events']:
+            recorder['events'].append((name, recorder['generation'], start - recorder['start_ns'], duration,
+                                       threading.get_ident()))
+        else:
+            recorder['dropped_events'] += 1
+        for hook in recorder['hooks']:
+            hook({'type': 'phase', 'name': name, 'generation': recorder['generation'],
+                  'start_ns': start - recorder['start_ns'], 'duration_ns': duration})
+
+
+def phase(name):
+    """
+    Time a block of code as one phase of the current generation:
+        with phase('count_neighbors'):
+            counts = count_neighbors_grid(life_state)
+    Phases can be nested. Nothing is recorded (and almost nothing is spent) when instrumentation is off or the
+    generation is not sampled.
+
+    IN:
+        name (str): the name of the phase.
+
+    OUT:
+        context manager.
+    """
+    recorder = _recorder
+    if recorder is None or not _is_sampled(recorder):
+        return _NO_PHASE
+    return _timed_phase(recorder, name)
+
+
+def end_generation(life_state=None, previous_life_state=None, changed_cells=None):
+    """
+    Mark the end of a generation of the active recorder, recording the population and the number of changed cells.
+
+    IN:
+        life_state (ndarray, optional): the new generation, to record its population (non-zero cells).
+        previous_life_state (ndarray, optional): the generation before it, to count the changed cells.
+        changed_cells (tuple of two 1D ndarrays, optional): the changed cells if the engine already knows them.
+
+    OUT: None
+    """
+    recorder = _recorder
+    if recorder is None:
+        return
+    if _is_sampled(recorder):
+        population = int(np.count_nonzero(life_state)) if life_state is not None else None
+        if changed_cells is not None:
+            changed = len(changed_cells[0])
+        elif life_state is not None and previous_life_state is not None:
+            changed = int(np.count_nonzero(life_state != previous_life_state))
+        else:
+            changed = None
+        now = time.perf_counter_ns() - recorder['start_ns']
+        recorder['generations'].append((recorder['generation'], now, population, changed))
+        for hook in recorder['hooks']:
+            hook({'type': 'generation', 'generation': recorder['generation'], 'time_ns': now,
+                  'population': population, 'changed_cells': changed})
+    recorder['generation'] += 1
+
+
+def summarize_phases(recorder):
+    """
+    Total and mean time of every phase over the recorded generations.
+    IN:
+        recorder (dict): the recorder from create_recorder.
+    OUT:
+        dict: phase name -> {'count', 'total_ms', 'mean_ms', 'max_ms'}, slowest phase first.
+    """
+    durations = {}
+    for name, generation, start, duration, thread in recorder['events']:
+        durations.setdefault(name, []).append(duration)
+    summary = {}
+    for name, values in durations.items():
+        values = np.array(values) / 1e6
+        summary[name] = {'count': len(values), 'total_ms': float(values.sum()), 'mean_ms': float(values.mean()),
+                         'max_ms': float(values.max())}
+    return dict(sorted(summary.items(), key=lambda item: -item[1]['total_ms']))
+
+
+def export_chrome_trace(recorder, filename):
+    """
+    Write the recording in the Chrome trace event format, which chrome://tracing, Perfetto (ui.perfetto.dev)
+    and speedscope open as a timeline and flame graph. Phases are complete ('X') events and the population and
+    changed cells are counter ('C') tracks.
+
+    IN:
+        recorder (dict): the recorder from create_recorder.
+        filename (str): the JSON file to write.
+
+    OUT: None
+    """
+    pid = os.getpid()
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'Game of Life'}}]
+    for name, generation, start, duration, thread in recorder['events']:
+        trace_events.append({'name': name, 'cat': 'phase', 'ph': 'X', 'pid': pid, 'tid': thread,
+                             'ts': start / 1000, 'dur': duration / 1000, 'args': {'generation': generation}})
+    for generation, now, population, changed in recorder['generations']:
+        counters = {key: value for key, value in [('population', population), ('changed_cells', changed)]
+                    if value is not None}
+        if counters:
+            trace_events.append({'name': 'cells', 'ph': 'C', 'pid': pid, 'ts': now / 1000, 'args': counters})
+    with open(filename, 'w') as file:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                   'otherData': {'sample_every': recorder['sample_every'],
+                                 'dropped_events': recorder['dropped_events']}}, file)
@@ -0,0 +1,308 @@
+import json
+
+import numpy as np
+
+from .life import init_life_state_1, init_life_state_2, update_life_state_1, update_life_state_2
+from .rules import init_life_state_3, compile_rules, get_program_types, update_life_state_3_compiled
+from .io import save_to_csv, save_state_to_csv, save_rules_to_json, load_rules_from_json
+from .cycles import create_cycle_detector, update_cycle_detector
+from .patterns import load_pattern, get_pattern_size, format_rule_string
+from .renderer import draw_life_state_1, draw_life_state_2, draw_life_state_3
+
+
+#helper function that tells the user the board repeats and returns whether to stop the run
+def _stop_on_cycle(detector, life_state, previous_life_state, stop_on_cycle):
+    if update_cycle_detector(detector, life_state, previous_life_state) is None or not stop_on_cycle:
+        return False
+    print(f"The board repeats every {detector['period']} generation(s) from generation {detector['start']} on, "
+          "stopping early.")
+    return True
+
+
+def play_game_of_life_1(life_state = None, stop_on_cycle=True): 
+    """
+    Play the game of life by updating the grid based on user input.
+    IN:
+        life_state (ndarray or str, optional): a starting grid, or a .rle / .cells pattern file that is placed
+                                               in the middle of the grid. A random grid is used if None.
+        stop_on_cycle (bool): stop the iterations once the board settles into a still life or oscillator.
+    OUT: None
+    """
+
+    print("Welcome to the Game of Life!")
+    #ask the user for initial state
+    n = int(input("Enter the number of rows (must be an integer, e.g., 30): "))
+    #input check
+    while not isinstance(n, int):
+        n = int(input("Invalid input for rows. Please enter an integer."))
+    
+    m = int(input("Enter the number of columns (must be an integer, e.g., 30): "))
+    #input check
+    while not isinstance(m, int):
+        m = int(input("Invalid input for columns. Please enter an integer."))
+
+    p = float(input("Enter the probability of a cell being alive (must be a decimal number between 0 and 1, e.g., 0.2): "))
+    #input check
+    while not 0 <= p <= 1 or not isinstance(p, float):
+        p = float(input("Invalid input for probability. Please enter a decimal number between 0 and 1."))
+
+    # Initialize the grid
+    if life_state is None:
+        life_state = init_life_state_1(n, m, p)
+    elif isinstance(life_state, str):
+        # Draw the pattern file in the middle of an empty n x m grid
+        height, width = get_pattern_size(life_state)
+        life_state, rules = load_pattern(life_state, np.zeros((n, m), dtype=bool), (n - height) // 2,
+                                         (m - width) // 2)
+        if rules is not None and rules != {'b1': 3, 'b2': 3, 'd1': 2, 'd2': 3}:
+            print(f"Note: the pattern was made for the rule {format_rule_string(**rules)}, level 1 plays B3/S23.")
+    else:
+        life_state = life_state
+    #keep the initial state so it can be saved at the end
+    initial_life_state = life_state.copy()
+    # ask the user for the number of iterations
+    num_iterations = int(input("Enter the number of iterations to run (must be an integer): "))
+    #input check
+    while not isinstance(num_iterations, int):
+        num_iterations = int(input("Invalid input for iterations. Please enter an integer."))
+
+    # Watch for the board repeating itself
+    detector = create_cycle_detector(life_state)
+    # Display the initial grid
+    draw_life_state_1(life_state)
+    # Update the grid and display it at each iteration
+    for iteration in range(num_iterations):
+        print(f"Iteration {iteration + 1}:")
+        previous_life_state, life_state = life_state, update_life_state_1(life_state)  # Update the grid
+        draw_life_state_1(life_state)  # Display the grid after update
+        if _stop_on_cycle(detector, life_state, previous_life_state, stop_on_cycle):
+            break
+        
+    # Ask the user if they want to continue updating
+    while True:
+        continue_update = input("Do you want to continue updating the grid? (yes/no): ").strip().lower()
+        if continue_update == 'yes':
+            num_iterations = int(input("How many more iterations would you like to run? "))
+            # Display the grid initially
+            draw_life_state_1(life_state) 
+            for iteration in range(num_iterations):
+                print(f"Iteration {iteration + 1}:")
+                previous_life_state, life_state = life_state, update_life_state_1(life_state)  # Update the grid
+                draw_life_state_1(life_state) 
+                if _stop_on_cycle(detector, life_state, previous_life_state, stop_on_cycle):
+                    break
+        elif continue_update == 'no':
+            break
+        else:
+            print("Invalid input:")
+    
+    #Ask the user if they want to save the initial and final configurations to a CSV file
+    while True:
+        save_config = input("Do you want to save the initial and final configurations as CSV files? (yes/no): ").strip().lower()
+        if save_config == 'yes':
+            #Ask the user for the filename
+            initial_filename = input("Enter a filename to save the initial state (e.g., initial_state.csv): ")
+            final_filename = input("Enter a filename to save the final state (e.g., final_state.csv): ")
+            
+            # Save the initial and final configurations
+            save_to_csv(life_state, final_filename)  # Save the final state
+            save_to_csv(initial_life_state, initial_filename)  # Save the initial state
+            print(f"Initial and final configurations saved as {initial_filename} and {final_filename}.")
+            break
+        elif save_config == 'no':
+            break
+        else:
+            print("Invalid input:")
+
+
+def play_game_of_life_2(stop_on_cycle=True):
+    """
+    Play the game of life by updating the grid based on user input.
+    IN:
+        stop_on_cycle (bool): stop the iterations once the board settles into a still life or oscillator.
+    OUT: None
+    """
+
+    print("Welcome to the Game of Life!")
+    #ask the user for initial state
+    n = int(input("Enter the number of rows (must be an integer, e.g., 30): "))
+    #input check
+    while not isinstance(n, int):
+        n = int(input("Invalid input for rows. Please enter an integer."))
+    
+    m = int(input("Enter the number of columns (must be an integer, e.g., 30): "))
+    #input check
+    while not isinstance(m, int):
+        m = int(input("Invalid input for columns. Please enter an integer."))
+
+    p = float(input("Enter the probability of a cell being alive (must be a decimal number between 0 and 1, e.g., 0.2): "))
+    #input check
+    while not 0 <= p <= 1 or not isinstance(p, float):
+        p = float(input("Invalid input for probability. Please enter a decimal number between 0 and 1."))
+
+    # Initialize the grid
+    life_state = init_life_state_2(n, m, p)
+    #keep the initial state so it can be saved at the end
+    initial_life_state = life_state.copy()
+
+    # Step 2: Ask the user for the rules
+    print("Enter the custom rules for the Game of Life:")
+    b1 = int(input("Enter the lower bound (b1) for a dead cell to come to life (e.g., 3): "))
+    #intput check
+    while b1 < 0 or not isinstance(b1, int):
+        b1 = int(input("Invalid input for b1. Please enter an integer."))
+    
+    b2 = int(input("Enter the upper bound (b2) for a dead cell to come to life (e.g., 3): "))
+    #intput check
+    while b2 < 0 or not isinstance(b2, int):
+        b2 = int(input("Invalid input for b2. Please enter an integer."))
+    
+    d1 = int(input("Enter the lower bound (d1) for an alive cell to stay alive (e.g., 2): "))
+    #intput check    
+    while d1 < 0 or not isinstance(d1, int):
+        d1 = int(input("Invalid input for d1. Please enter an integer."))
+
+    d2 = int(input("Enter the upper bound (d2) for an alive cell to stay alive (e.g., 3): "))
+    #intput check
+    while d2 < 0 or not isinstance(d2, int):
+        d2 = int(input("Invalid input for d2. Please enter an integer."))
+    
+    
+    # ask the user for the number of iterations
+    num_iterations = int(input("Enter the number of iterations to run (must be an integer): "))
+    #input check
+    if not isinstance(num_iterations, int):
+        num_iterations = int(input("Invalid input for iterations. Please enter an integer."))
+
+    # Watch for the board repeating itself
+    detector = create_cycle_detector(life_state)
+    # Display the initial grid
+    draw_life_state_2(life_state)
+
+    # Update the grid and display it at each iteration
+    for iteration in range(num_iterations):
+        print(f"Iteration {iteration + 1}:")
+        previous_life_state, life_state = life_state, update_life_state_2(life_state, b1, b2, d1, d2)
+        draw_life_state_2(life_state)
+        if _stop_on_cycle(detector, life_state, previous_life_state, stop_on_cycle):
+            break
+        
+    # Ask the user if they want to continue updating
+    while True:
+        continue_update = input("Do you want to continue updating the grid? (yes/no): ").strip().lower()
+        if continue_update == 'yes':
+            num_iterations = int(input("How many more iterations would you like to run? "))
+            while not isinstance(num_iterations, int):
+                num_iterations = int(input("Invalid input for iterations. Please enter an integer."))
+            # Display the grid initially
+            draw_life_state_2(life_state) 
+            for iteration in range(num_iterations):
+                print(f"Iteration {iteration + 1}:")
+                previous_life_state, life_state = life_state, update_life_state_2(life_state, b1, b2, d1, d2)
+                draw_life_state_2(life_state) 
+                if _stop_on_cycle(detector, life_state, previous_life_state, stop_on_cycle):
+                    break
+        elif continue_update == 'no':
+            break
+        else:
+            print("Invalid input.")
+    
+    #Ask the user if they want to save the initial and final configurations to a CSV file
+    while True:
+        save_config = input("Do you want to save the initial and final configurations as CSV files? (yes/no): ").strip().lower()
+        if save_config == 'yes':
+            #Ask the user for the filename
+            initial_filename = input("Enter a filename to save the initial state (e.g., initial_state.csv): ")
+            final_filename = input("Enter a filename to save the final state (e.g., final_state.csv): ")
+            rules_filename = input("Enter a filename to save the rules (e.g., rules.json): ")
+
+            # Save the initial and final configurations
+            save_to_csv(life_state, final_filename)  # Save the final state
+            save_to_csv(initial_life_state, initial_filename)  # Save the initial state
+            print(f"Initial and final configurations saved as {initial_filename} and {final_filename}.")
+            
+            # Save the user-defined rules as a JSON file
+            rules = {"b1": b1, "b2": b2, "d1": d1, "d2": d2}
+            save_rules_to_json(rules, rules_filename)
+            print(f"Rules saved as {rules_filename}.")
+            break
+        elif save_config == 'no':
+            break
+        else:
+            print("Invalid input.")
+
+
+# Main function to run the game
+def play_game_of_life_3():
+    #Ask the user for initial state parameters
+    n = int(input("Enter number of rows: "))
+    #input check
+    while not isinstance(n, int):
+        n = int(input("Invalid input for rows. Please enter an integer."))
+
+    m = int(input("Enter number of columns: "))
+    #input check
+    while not isinstance(m, int):        
+        m = int(input("Invalid input for columns. Please enter an integer."))
+
+    p_list = list(map(float, input("Enter the probabilities for each state (comma separated): ").split(',')))
+    #input check
+    while not all(0 <= p <= 1 for p in p_list):
+        p_list = list(map(float, input("Invalid input for probabilities. Please enter decimal numbers between 0 and 1 (comma separated): ").split(',')))
+    
+    colors = list(map(str, input("Enter the colors for each state (comma separated): ").split(',')))
+    #input check
+    while not all(isinstance(color, str) for color in colors):        
+        colors = list(map(str, input("Invalid input for colors. Please enter strings (comma separated): ").split(',')))
+
+    states = list(map(int, input("Enter the states (comma separated): ").split(',')))
+    #input check
+    while not all(isinstance(state, int) for state in states):        
+        states = list(map(int, input("Invalid input for states. Please enter integers (comma separated): ").split(',')))
+
+    # Generate the initial life state randomly based on probabilities
+    life_state = init_life_state_3(n, m, p_list, states)
+    #keep the initial state so it can be saved at the end
+    initial_life_state = life_state.copy()
+
+    #Ask the user for the rules file (JSON)
+    rules_file = input("Enter the JSON file path for the rules: ")
+    rules = load_rules_from_json(rules_file)
+    rules = {int(key): value for key, value in rules.items()}
+    program = compile_rules(rules)
+    neighbor_counts = np.empty((len(get_program_types(program)), n, m), dtype=np.uint8)
+    one_hot = np.empty((n, m), dtype=bool)
+    rng = np.random.default_rng()
+    #Ask the user for the number of iterations
+    iterations = int(input("Enter the number of iterations: "))
+
+    #Display the initial state
+    draw_life_state_3(life_state, colors={state: color for state, color in zip(states, colors)})
+    #Display and update the grid for each iteration
+    for i in range(iterations):
+        print(f"Iteration {i + 1}:")
+        life_state = update_life_state_3_compiled(life_state, program, neighbor_counts=neighbor_counts, rng=rng,
+                                                  one_hot=one_hot)
+        draw_life_state_3(life_state, colors={state: color for state, color in zip(states, colors)})
+
+        # Ask user if they want to continue
+        continue_game = input("Do you want to continue to the next iteration? (y/n): ")
+        if continue_game.lower() != 'y':
+            break
+    
+    #Ask if the user wants to save the initial and final states
+    save_choice = input("Do you want to save the initial and final states as CSV files? (y/n): ")
+    if save_choice.lower() == 'y':
+        initial_filename = input("Enter the filename for the initial state (CSV): ")
+        final_filename = input("Enter the filename for the final state (CSV): ")
+        save_state_to_csv(life_state, final_filename)
+        save_state_to_csv(initial_life_state, initial_filename)
+
+    #Ask if the user wants to save the rules
+    save_rules_choice = input("Do you want to save the rules as a JSON file? (y/n): ")
+    if save_rules_choice.lower() == 'y':
+        rules_filename = input("Enter the filename to save the rules as JSON: ")
+        with open(rules_filename, 'w') as json_file:
+            json.dump(rules, json_file, indent=4)
+
+    print("Game Over.")
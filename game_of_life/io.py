@@ -0,0 +1,45 @@
+import csv
+import json
+
+import numpy as np
+
+from .instrumentation import phase
+
+
+#helper function that saves the life_state grid to a CSV file
+def save_to_csv(life_state, filename):
+    """
+    Save the life_state grid to a CSV file.
+    IN: 
+        life_state (ndarray): The current state of the grid.
+        filename (str): The name of the file to save the grid.
+    OUT: None
+    """
+    # Save the grid to a CSV file with '1' for alive cells and '0' for dead cells
+    with phase('save'):
+        np.savetxt(filename, life_state, delimiter=',', fmt='%d')
+
+
+def save_state_to_csv(state, filename):
+    with phase('save'), open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerows(state)
+
+
+def save_rules_to_json(rules, filename):
+    """
+    Save the rules to a JSON file.
+    IN:
+        rules (dict): The dictionary of rules.
+        filename (str): The name of the file to save the rules.
+    OUT: None
+    """
+    with open(filename, 'w') as f:
+        json.dump(rules, f, indent=4)
+
+
+# Function to load rules from a JSON file
+def load_rules_from_json(filename):
+    with open(filename, 'r') as file:
+        rules = json.load(file)
+    return rules
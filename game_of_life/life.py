@@ -0,0 +1,256 @@
+import numpy as np
+
+from .instrumentation import phase
+from .statistics import record_generation
+
+#scratch memory per row band when a grid is updated in bands (e.g. memmap-backed boards), in bytes
+DEFAULT_MEMORY_BUDGET = 64 * 1024 ** 2
+
+#positions of neighbors relative to (i,j)
+NEIGHBORS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def init_life_state_1(n, m, p, life_state = None):
+    """
+    Generate an initial random subset of life cells (2D points).
+    
+    IN: 
+        n, int: number of rows.
+        m, int: number of columns.
+        p, float: probability of a cell being alive.
+    
+    OUT:
+        ndarray of shape (n, m), initial state of the cells where 1 represents alive, 0 represents dead.
+    """
+    # Generate a random grid of shape (n, m) with values from 0 to 1 and if the value is less than p, set the cell to 1 and otherwise 0
+    if life_state is None:
+        return np.random.rand(n, m) < p
+    else:
+        return life_state
+
+
+def init_life_state_2(n, m, p):
+    """
+    Generate an initial random subset of life cells (2D points).
+    
+    IN: 
+        n, int: number of rows.
+        m, int: number of columns.
+        p, float: probability of a cell being alive.
+    
+    OUT:
+        ndarray of shape (n, m), initial state of the cells where 1 represents alive, 0 represents dead.
+    """
+    # Generate a random grid of shape (n, m) with values from 0 to 1 and if the value is less than p, set the cell to 1 and otherwise 0
+    return np.random.rand(n, m) < p
+
+
+#helper function that returns the number of alive neighbors
+def count_neighbors(i, j, life_state):
+        n, m = life_state.shape
+        #positions of neighbors relative to (i,j)
+        neighbors = [(-1, -1), (-1, 0), (-1, 1),( 0, -1),( 0, 1),( 1, -1), ( 1, 0), ( 1, 1)]
+        count = 0
+        for di, dj in neighbors:
+            ni, nj = i + di, j + dj
+            # Check if the neighbor is within bounds and is alive
+            if 0 <= ni < n and 0 <= nj < m:
+                count += life_state[ni, nj]
+        return count
+
+
+#helper function that returns the number of alive neighbors of every cell at once
+def count_neighbors_grid(life_state, out_counts=None):
+    """
+    Count the alive neighbors of every cell in one pass using shifted slices of the grid.
+    Cells outside the grid count as dead, exactly like count_neighbors.
+    
+    IN:
+        life_state (ndarray of shape (n, m)): the current state of the grid.
+        out_counts (ndarray of shape (n, m), optional): a pre-allocated array for the counts, e.g. a uint8
+                                                        buffer reused between row bands.
+    
+    OUT:
+        ndarray of shape (n, m): for each cell, the sum of its 8 neighbors.
+    """
+    n, m = life_state.shape
+    if out_counts is None:
+        #sum in an integer (or the grid's own float) type so bool grids are counted and not or-ed
+        counts = np.zeros((n, m), dtype=np.result_type(life_state.dtype, np.int_))
+    else:
+        counts = out_counts
+        counts[...] = 0
+    for di, dj in NEIGHBORS:
+        # Add the neighbor at (i+di, j+dj) to cell (i, j), skipping the rows/columns that fall outside the grid
+        counts[max(-di, 0):n - max(di, 0), max(-dj, 0):m - max(dj, 0)] += \
+            life_state[max(di, 0):n - max(-di, 0), max(dj, 0):m - max(-dj, 0)]
+    return counts
+
+
+#helper function that returns how many rows fit in a band of memory_budget bytes
+def get_band_rows(m, dtype, memory_budget=None):
+    """
+    Number of rows to update at once so the scratch arrays of one band stay within memory_budget bytes.
+    IN:
+        m (int): number of columns.
+        dtype (np.dtype): dtype of the grid.
+        memory_budget (int, optional): bytes of scratch memory per band, DEFAULT_MEMORY_BUDGET if None.
+    OUT:
+        int: rows per band, at least 1.
+    """
+    if memory_budget is None:
+        memory_budget = DEFAULT_MEMORY_BUDGET
+    #neighbor counts plus about 6 bool temporaries of the rules per cell
+    bytes_per_row = m * (np.result_type(dtype, np.uint8).itemsize + 6)
+    return max(1, memory_budget // bytes_per_row - 2)
+
+
+#helper function that applies apply_rule(band, counts, out_band, changes) to bands of rows, reading one extra row
+#above and below each band for the neighbor counts; the bands are views, so memmaps are only paged in one band at a time
+def _update_in_bands(life_state, out_life_state, apply_rule, memory_budget, statistics=None):
+    n, m = life_state.shape
+    # The births and deaths are counted band by band while the band is still in the cache
+    changes = None if statistics is None else np.zeros((2, 2), dtype=np.int64)
+    band_rows = get_band_rows(m, life_state.dtype, memory_budget)
+    counts = np.empty((min(band_rows, n) + 2, m), dtype=np.result_type(life_state.dtype, np.uint8))
+    for low in range(0, n, band_rows):
+        high = min(low + band_rows, n)
+        top, bottom = max(low - 1, 0), min(high + 1, n)
+        # Rows outside the grid count as dead, so the first and last band simply have no overlap row there
+        with phase('count_neighbors'):
+            band_counts = count_neighbors_grid(life_state[top:bottom], out_counts=counts[:bottom - top])
+        with phase('apply_rules'):
+            apply_rule(life_state[low:high], band_counts[low - top:high - top], out_life_state[low:high], changes)
+    if statistics is not None:
+        record_generation(statistics, changes=changes)
+    return out_life_state
+
+
+#helper function that applies the level 1 rules to a grid (or band) given its neighbor counts,
+#adding the births and deaths to out_changes (see statistics.count_changes) if given
+def _apply_rule_1(life_state, alive_neighbors, out_life_state, out_changes=None):
+    alive = life_state == 1
+    #cell is alive, (i,j) = 1: stays alive with 2 or 3 neighbors, otherwise dies
+    survives = (alive_neighbors == 2) | (alive_neighbors == 3)
+    np.copyto(out_life_state, survives, where=alive)
+    #cell is dead, (i,j) = 0: comes to life with exactly 3 neighbors
+    born = ~alive & (alive_neighbors == 3)
+    np.copyto(out_life_state, True, where=born)
+    if out_changes is not None:
+        # Counted from the masks while they are in the cache, not by comparing the two grids afterwards
+        with phase('statistics'):
+            out_changes[0, 1] += np.count_nonzero(born)
+            out_changes[1, 0] += np.count_nonzero(alive & ~survives)
+
+
+def update_life_state_1(life_state, out_life_state=None, memory_budget=None, statistics=None):
+    """
+    For each cell, evaluate the update rules specified above to obtain its new state.
+    
+    IN: 
+        life_state (ndarray of shape (n, m)): the current state of the grid.
+        out_life_state (ndarray of shape (n, m), optional): a pre-allocated array for storing the next state of the cells. 
+                                                            If None, a new array will be created.
+        memory_budget (int, optional): update the grid in row bands using at most this many bytes of scratch memory.
+                                       np.memmap grids are always updated in bands (DEFAULT_MEMORY_BUDGET if None).
+        statistics (dict, optional): a collector from statistics.create_statistics that records the population,
+                                     births, deaths and changed cells of the new generation.
+    
+    OUT:
+        out_life_state (ndarray of shape (n, m)): the next state of the grid after applying the rules.
+    """
+    #dimensions of the life_state
+    n, m = life_state.shape
+    
+    #create a new array with the same shape as life_state if out_life_state is None
+    if out_life_state is None:
+        out_life_state = np.zeros_like(life_state)
+    
+    # Boards too big for memory are updated a band of rows at a time
+    if memory_budget is not None or isinstance(life_state, np.memmap):
+        return _update_in_bands(life_state, out_life_state, _apply_rule_1, memory_budget, statistics)
+
+    # Update the whole grid at once based on the rules
+    with phase('count_neighbors'):
+        alive_neighbors = count_neighbors_grid(life_state)
+    changes = None if statistics is None else np.zeros((2, 2), dtype=np.int64)
+    with phase('apply_rules'):
+        _apply_rule_1(life_state, alive_neighbors, out_life_state, changes)
+    if statistics is not None:
+        record_generation(statistics, out_life_state, changes=changes)
+    
+    return out_life_state
+
+
+def apply_rule_2(life_state, alive_neighbors, out_life_state, b1, b2, d1, d2, out_changes=None):
+    """
+    Apply the level 2 rules to a grid (or band of rows) whose neighbor counts are already known, e.g. counted over
+    a larger neighborhood by neighborhoods.count_neighbors_kernel.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the current grid.
+        alive_neighbors (ndarray of shape (n, m)): the neighbor count of every cell.
+        out_life_state (ndarray of shape (n, m)): the array the next grid is written into.
+        b1, b2, d1, d2 (int or float): the birth and survival bounds, see update_life_state_2.
+        out_changes (ndarray of shape (2, 2), optional): the births and deaths are added to it, see
+                                                         statistics.count_changes.
+
+    OUT: None
+    """
+    born = (b1 <= alive_neighbors) & (alive_neighbors <= b2)  # Dead cell comes to life
+    survives = (d1 <= alive_neighbors) & (alive_neighbors <= d2)  # Alive cell stays alive
+    dead = life_state == 0
+    #cell is dead, (i,j) = 0 -> born, cell is alive, (i,j) = 1 -> survives
+    np.copyto(out_life_state, np.where(dead, born, survives))
+    if out_changes is not None:
+        # Counted from the masks while they are in the cache, not by comparing the two grids afterwards
+        with phase('statistics'):
+            out_changes[0, 1] += np.count_nonzero(dead & born)
+            out_changes[1, 0] += dead.size - np.count_nonzero(dead | survives)
+
+
+def update_life_state_2(life_state, b1=3, b2=3, d1=2, d2=3, out_life_state=None, memory_budget=None,
+                        statistics=None):
+    """
+    For each cell, evaluate the update rules specified above to obtain its new state based on custom bounds.
+    
+    IN: 
+        life_state (ndarray): Current state of the grid (n, m).
+        b1 (int): Lower bound of the number of neighbors for a dead cell to come to life.
+        b2 (int): Upper bound of the number of neighbors for a dead cell to come to life.
+        d1 (int): Lower bound of the number of neighbors for an alive cell to continue being alive.
+        d2 (int): Upper bound of the number of neighbors for an alive cell to continue being alive.
+        out_life_state (ndarray): A pre-allocated array for storing the next state of the cells. 
+                                  If None, a new array will be created.
+        memory_budget (int, optional): update the grid in row bands using at most this many bytes of scratch memory.
+                                       np.memmap grids are always updated in bands (DEFAULT_MEMORY_BUDGET if None).
+        statistics (dict, optional): a collector from statistics.create_statistics that records the population,
+                                     births, deaths and changed cells of the new generation.
+    
+    OUT: 
+        out_life_state (ndarray): The next state of the grid (n, m).
+    """
+    # Get the dimensions of the grid
+    n, m = life_state.shape
+    
+    # If out_life_state is None, create a new array with the same shape as life_state
+    if out_life_state is None:
+        out_life_state = np.zeros_like(life_state)
+    
+    apply_rule = lambda band, counts, out_band, changes=None: apply_rule_2(band, counts, out_band, b1, b2, d1, d2,
+                                                                        changes)
+    # Boards too big for memory are updated a band of rows at a time
+    if memory_budget is not None or isinstance(life_state, np.memmap):
+        return _update_in_bands(life_state, out_life_state, apply_rule, memory_budget, statistics)
+
+    # Update every cell at once based on the custom rules
+    with phase('count_neighbors'):
+        alive_neighbors = count_neighbors_grid(life_state)
+    changes = None if statistics is None else np.zeros((2, 2), dtype=np.int64)
+    with phase('apply_rules'):
+        apply_rule(life_state, alive_neighbors, out_life_state, changes)
+    if statistics is not None:
+        record_generation(statistics, out_life_state, changes=changes)
+    
+    # Return the updated grid
+    return out_life_state
@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+
+from .life import DEFAULT_MEMORY_BUDGET, update_life_state_2
+
+#grids are stored as .npy files, so they can also be opened with np.load(filename, mmap_mode='r')
+
+
+def create_memmap_life_state(filename, n, m, dtype=np.uint8, life_state=None):
+    """
+    Create a grid backed by a file on disk instead of memory, for boards larger than RAM.
+
+    IN:
+        filename (str): the .npy file to create (overwritten if it exists).
+        n, m (int): number of rows and columns.
+        dtype (np.dtype): dtype of the cells.
+        life_state (ndarray of shape (n, m), optional): initial state to copy in; the grid starts all dead if None.
+
+    OUT:
+        np.memmap of shape (n, m), opened for reading and writing.
+    """
+    grid = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=(n, m))
+    if life_state is not None:
+        grid[...] = life_state
+    return grid
+
+
+def open_memmap_life_state(filename, mode='r'):
+    """
+    Open a grid saved by create_memmap_life_state without reading it into memory.
+    IN:
+        filename (str): the .npy file.
+        mode (str): 'r' for a read-only grid (e.g. the current generation), 'r+' to write into it.
+    OUT:
+        np.memmap of shape (n, m).
+    """
+    return np.lib.format.open_memmap(filename, mode=mode)
+
+
+#helper function that returns the byte offset of the cells in a .npy file
+def _data_offset(filename):
+    with open(filename, 'rb') as file:
+        if np.lib.format.read_magic(file) == (1, 0):
+            np.lib.format.read_array_header_1_0(file)
+        else:
+            np.lib.format.read_array_header_2_0(file)
+        return file.tell()
+
+
+#helper function that maps only rows low .. high - 1 of a .npy grid, so unmapping it releases those pages
+def _map_rows(filename, offset, dtype, m, low, high, mode):
+    return np.memmap(filename, dtype=dtype, mode=mode, offset=offset + low * m * dtype.itemsize, shape=(high - low, m))
+
+
+def play_memmap_life_state(filename, num_iterations, b1=3, b2=3, d1=2, d2=3, memory_budget=None,
+                           scratch_filename=None):
+    """
+    Run a board stored in a .npy file for num_iterations generations with the level 2 rules without ever
+    holding the whole board in memory. Two files are used: the next generation is written to the other file,
+    then they swap. Each generation is processed in windows of rows, and each window is mapped on its own
+    (with one overlap row above and below for the neighbor counts) and unmapped when done, so the memory
+    used stays about memory_budget however big the board is.
+
+    IN:
+        filename (str): the .npy file with the initial grid; it receives the final grid.
+        num_iterations (int): number of generations to run.
+        b1, b2, d1, d2 (int): the custom bounds, see update_life_state_2 (the defaults are the level 1 rules).
+        memory_budget (int, optional): bytes of memory to use, DEFAULT_MEMORY_BUDGET if None.
+        scratch_filename (str, optional): file for the other generation, filename + '.next.npy' if None.
+                                          It is removed at the end.
+
+    OUT:
+        str: filename, which now holds the final grid.
+    """
+    if memory_budget is None:
+        memory_budget = DEFAULT_MEMORY_BUDGET
+    if scratch_filename is None:
+        scratch_filename = filename + '.next.npy'
+    grid = open_memmap_life_state(filename, mode='r')
+    (n, m), dtype = grid.shape, grid.dtype
+    del grid
+    create_memmap_life_state(scratch_filename, n, m, dtype=dtype)
+    offsets = {filename: _data_offset(filename), scratch_filename: _data_offset(scratch_filename)}
+
+    # Half of the budget holds the mapped rows and the new rows, the other half is scratch for the update
+    window_rows = max(1, (memory_budget // 2) // (3 * m * dtype.itemsize))
+    buffer = np.empty((min(window_rows, n) + 2, m), dtype=dtype)
+    paths = [filename, scratch_filename]
+    for iteration in range(num_iterations):
+        source, target = paths
+        for low in range(0, n, window_rows):
+            high = min(low + window_rows, n)
+            top, bottom = max(low - 1, 0), min(high + 1, n)
+            # The current generation is only read, so its window is a read-only map of the file
+            life_state = _map_rows(source, offsets[source], dtype, m, top, bottom, 'r')
+            update_life_state_2(life_state, b1, b2, d1, d2, out_life_state=buffer[:bottom - top],
+                                memory_budget=memory_budget // 2)
+            out_life_state = _map_rows(target, offsets[target], dtype, m, low, high, 'r+')
+            out_life_state[...] = buffer[low - top:high - top]
+            out_life_state.flush()
+            del life_state, out_life_state
+        paths.reverse()
+
+    # After an odd number of generations the final grid is in the scratch file
+    if paths[0] != filename:
+        os.replace(paths[0], filename)
+    else:
+        os.remove(scratch_filename)
+    return filename
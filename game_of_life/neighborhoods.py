@@ -0,0 +1,238 @@
+import re
+
+import numpy as np
+
+from .life import apply_rule_2
+from .instrumentation import phase
+from .statistics import record_generation
+
+#kernels with more non-zero cells than this are counted with FFT convolution when method='auto'
+FFT_MIN_KERNEL_CELLS = 40
+#kernels with non-integer weights are compared with the rule bounds up to this tolerance (relative to the largest
+#possible count), so the rounding errors of the FFT and of the direct sums cannot flip a cell
+COUNT_TOLERANCE = 1e-9
+
+
+def get_kernel(neighborhood='moore', radius=1, include_center=False):
+    """
+    Build the kernel of a Larger than Life style neighborhood: every cell within radius counts with weight 1.
+
+    IN:
+        neighborhood (str): 'moore' (the (2r+1) x (2r+1) square), 'von_neumann' (|di| + |dj| <= r, a diamond)
+                            or 'circular' (di^2 + dj^2 <= r^2 + r, a disc as in Larger than Life).
+        radius (int): the range r of the neighborhood, 1 with 'moore' is the usual 8 neighbors.
+        include_center (bool): whether a cell counts itself.
+
+    OUT:
+        ndarray of shape (2r+1, 2r+1) and dtype int: kernel[r + di, r + dj] is the weight of the cell at (i+di, j+dj).
+    """
+    if radius < 1:
+        raise ValueError("radius must be at least 1.")
+    offsets = np.arange(-radius, radius + 1)
+    di, dj = np.meshgrid(offsets, offsets, indexing='ij')
+    if neighborhood == 'moore':
+        kernel = np.ones((2 * radius + 1, 2 * radius + 1), dtype=int)
+    elif neighborhood == 'von_neumann':
+        kernel = (np.abs(di) + np.abs(dj) <= radius).astype(int)
+    elif neighborhood == 'circular':
+        kernel = (di ** 2 + dj ** 2 <= radius ** 2 + radius).astype(int)
+    else:
+        raise ValueError(f"Unknown neighborhood {neighborhood!r}, expected 'moore', 'von_neumann' or 'circular'.")
+    kernel[radius, radius] = int(include_center)
+    return kernel
+
+
+def parse_ltl_rule(rule):
+    """
+    Read a Larger than Life rule in the Golly form "R5,C0,M1,S34..58,B34..45,NM" (Bosco's rule): range,
+    states (0 or 2), whether the middle cell counts itself, survival and birth ranges, neighborhood
+    (NM Moore, NN von Neumann, NC circular).
+
+    IN:
+        rule (str): the rule string.
+
+    OUT:
+        dict: {'kernel', 'b1', 'b2', 'd1', 'd2'}, ready for update_life_state_kernel.
+    """
+    match = re.fullmatch(r'R(\d+),C(\d+),M([01]),S(\d+)\.\.(\d+),B(\d+)\.\.(\d+),N([MNC])',
+                         rule.strip().upper().replace(' ', ''))
+    if match is None:
+        raise ValueError(f"Cannot read the rule {rule!r}, expected something like R5,C0,M1,S34..58,B34..45,NM.")
+    radius, states, middle, d1, d2, b1, b2, neighborhood = match.groups()
+    if int(states) > 2:
+        raise ValueError(f"The rule {rule!r} has {states} states, only two-state rules are supported.")
+    kernel = get_kernel({'M': 'moore', 'N': 'von_neumann', 'C': 'circular'}[neighborhood], int(radius),
+                        include_center=middle == '1')
+    return {'kernel': kernel, 'b1': int(b1), 'b2': int(b2), 'd1': int(d1), 'd2': int(d2)}
+
+
+#helper function that returns the smallest length >= size with only the prime factors 2, 3 and 5, which FFTs are fast on
+def _fast_length(size):
+    best = 2 * size
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < size:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+#helper function that counts by adding a shifted copy of the grid for every non-zero kernel cell
+def _count_direct(life_state, kernel, counts):
+    n, m = life_state.shape
+    kh, kw = kernel.shape
+    counts[...] = 0
+    for a, b in zip(*np.nonzero(kernel)):
+        di, dj = a - kh // 2, b - kw // 2
+        # Add the cell at (i+di, j+dj) to cell (i, j), skipping the rows/columns that fall outside the grid
+        source = life_state[max(di, 0):n - max(-di, 0), max(dj, 0):m - max(-dj, 0)]
+        target = counts[max(-di, 0):n - max(di, 0), max(-dj, 0):m - max(dj, 0)]
+        if kernel[a, b] == 1:
+            target += source
+        else:
+            target += kernel[a, b] * source
+    return counts
+
+
+#helper function that tells whether every weight of a kernel is a whole number, so the counts are exact integers
+def _has_integer_weights(kernel):
+    return np.issubdtype(kernel.dtype, np.integer) or bool(np.all(kernel == np.rint(kernel)))
+
+
+#helper function that returns the padded size of the FFT convolution of an (n, m) grid with a kernel
+def _fft_shape(grid_shape, kernel):
+    # Padding to the full convolution size keeps the edges from wrapping around: outside cells count as dead
+    return (_fast_length(grid_shape[0] + kernel.shape[0] - 1), _fast_length(grid_shape[1] + kernel.shape[1] - 1))
+
+
+def get_kernel_spectrum(kernel, grid_shape):
+    """
+    Fourier transform of a kernel padded for FFT counting on grids of one shape. Computing it once and passing it
+    to count_neighbors_kernel (or update_life_state_kernel) as spectrum= saves one FFT every generation.
+
+    IN:
+        kernel (ndarray of shape (kh, kw)): the weights, see count_neighbors_kernel.
+        grid_shape (tuple of int): the (n, m) shape of the grids it will count.
+
+    OUT:
+        complex ndarray: the spectrum, only valid for this kernel and grid shape.
+    """
+    kernel = np.asarray(kernel)
+    # Convolution flips the kernel, so flip it first to count the neighbor at (i+di, j+dj) with kernel[r+di, r+dj]
+    return np.fft.rfft2(kernel[::-1, ::-1], s=_fft_shape(grid_shape, kernel))
+
+
+#helper function that counts with one FFT convolution of the zero padded grid
+def _count_fft(life_state, kernel, counts, spectrum=None):
+    n, m = life_state.shape
+    kh, kw = kernel.shape
+    shape = _fft_shape(life_state.shape, kernel)
+    if spectrum is None:
+        spectrum = get_kernel_spectrum(kernel, life_state.shape)
+    elif spectrum.shape != (shape[0], shape[1] // 2 + 1):
+        raise ValueError(f"The spectrum has shape {spectrum.shape}, it was not made by get_kernel_spectrum for this "
+                         f"kernel and a grid of shape {life_state.shape}.")
+    full = np.fft.irfft2(np.fft.rfft2(life_state, s=shape) * spectrum, s=shape)
+    same = full[kh // 2:kh // 2 + n, kw // 2:kw // 2 + m]
+    if _has_integer_weights(kernel) or np.issubdtype(counts.dtype, np.integer):
+        # The FFT is only exact up to rounding errors, counts over integer weights are rounded back to integers
+        np.rint(same, out=same)
+    counts[...] = same
+    return counts
+
+
+def count_neighbors_kernel(life_state, kernel, method='auto', out_counts=None, spectrum=None):
+    """
+    Weighted neighbor count of every cell: the sum of kernel[r + di, r + dj] * life_state[i + di, j + dj] over the
+    kernel, with cells outside the grid counting as dead (like count_neighbors_grid). Small kernels are counted
+    directly in O(nm * kernel cells); large ones with an FFT convolution in O(nm log nm), whatever the radius.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the grid (0/1 for Larger than Life).
+        kernel (ndarray of shape (kh, kw)): the weights, with odd kh and kw so it has a center, e.g. from get_kernel.
+        method (str): 'direct', 'fft', or 'auto' to pick by the number of non-zero kernel cells.
+        out_counts (ndarray of shape (n, m), optional): a pre-allocated array for the counts.
+        spectrum (complex ndarray, optional): the kernel's spectrum from get_kernel_spectrum, reused by the FFT
+                                              method instead of transforming the kernel again.
+
+    OUT:
+        ndarray of shape (n, m): the counts, int64 for integer kernels and float64 otherwise.
+    """
+    kernel = np.asarray(kernel)
+    if kernel.ndim != 2 or kernel.shape[0] % 2 == 0 or kernel.shape[1] % 2 == 0:
+        raise ValueError(f"The kernel must be 2D with odd sides, got shape {kernel.shape}.")
+    if out_counts is None:
+        out_counts = np.empty(life_state.shape, dtype=np.int64 if np.issubdtype(kernel.dtype, np.integer)
+                              else np.float64)
+    if method == 'auto':
+        method = 'fft' if np.count_nonzero(kernel) > FFT_MIN_KERNEL_CELLS else 'direct'
+    if method == 'direct':
+        return _count_direct(life_state, kernel, out_counts)
+    if method == 'fft':
+        return _count_fft(life_state, kernel, out_counts, spectrum)
+    raise ValueError(f"Unknown method {method!r}, expected 'auto', 'direct' or 'fft'.")
+
+
+def update_life_state_kernel(life_state, kernel, b1=3, b2=3, d1=2, d2=3, out_life_state=None, method='auto',
+                             out_counts=None, statistics=None, spectrum=None):
+    """
+    Update the grid with the level 2 rules, counting neighbors over any neighborhood: a dead cell comes to life
+    when b1 <= count <= b2 and an alive cell stays alive when d1 <= count <= d2. With get_kernel('moore', 1) this
+    is exactly update_life_state_2. With non-integer weights the bounds are compared up to COUNT_TOLERANCE, so
+    'direct' and 'fft' give the same grid.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the current grid.
+        kernel (ndarray): the neighborhood weights, see count_neighbors_kernel and get_kernel.
+        b1, b2, d1, d2 (int or float): the birth and survival bounds, see update_life_state_2.
+        out_life_state (ndarray of shape (n, m), optional): a pre-allocated array for the next grid.
+        method (str): how to count, see count_neighbors_kernel.
+        out_counts (ndarray of shape (n, m), optional): a buffer for the counts, reused between generations.
+        statistics (dict, optional): a collector from statistics.create_statistics.
+        spectrum (complex ndarray, optional): the kernel's spectrum from get_kernel_spectrum, reused between generations.
+
+    OUT:
+        ndarray of shape (n, m): the next grid.
+    """
+    kernel = np.asarray(kernel)
+    if out_life_state is None:
+        out_life_state = np.zeros_like(life_state)
+    with phase('count_neighbors'):
+        counts = count_neighbors_kernel(life_state, kernel, method, out_counts, spectrum)
+    if not _has_integer_weights(kernel):
+        tolerance = COUNT_TOLERANCE * max(1.0, float(np.abs(kernel).sum()))
+        b1, b2, d1, d2 = b1 - tolerance, b2 + tolerance, d1 - tolerance, d2 + tolerance
+    changes = None if statistics is None else np.zeros((2, 2), dtype=np.int64)
+    with phase('apply_rules'):
+        apply_rule_2(life_state, counts, out_life_state, b1, b2, d1, d2, changes)
+    if statistics is not None:
+        record_generation(statistics, out_life_state, changes=changes)
+    return out_life_state
+
+
+def play_life_state_kernel(life_state, num_iterations, kernel, b1=3, b2=3, d1=2, d2=3, method='auto'):
+    """
+    Run num_iterations generations of update_life_state_kernel, reusing the same buffers every generation.
+    IN:
+        life_state (ndarray of shape (n, m)): the initial grid.
+        num_iterations (int): number of generations.
+        kernel, b1, b2, d1, d2, method: see update_life_state_kernel.
+    OUT:
+        ndarray of shape (n, m): the grid after num_iterations generations.
+    """
+    kernel = np.asarray(kernel)
+    current, buffer = life_state.copy(), np.empty_like(life_state)
+    counts = np.empty(life_state.shape, dtype=np.int64 if np.issubdtype(kernel.dtype, np.integer) else np.float64)
+    # The kernel's spectrum only depends on the kernel and the grid shape, so it is transformed once per run
+    uses_fft = method == 'fft' or (method == 'auto' and np.count_nonzero(kernel) > FFT_MIN_KERNEL_CELLS)
+    spectrum = get_kernel_spectrum(kernel, life_state.shape) if uses_fft else None
+    for _ in range(num_iterations):
+        update_life_state_kernel(current, kernel, b1, b2, d1, d2, out_life_state=buffer, method=method,
+                                 out_counts=counts, spectrum=spectrum)
+        current, buffer = buffer, current
+    return current
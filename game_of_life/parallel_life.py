@@ -0,0 +1,140 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .life import NEIGHBORS
+
+
+#helper function that computes the next state of the interior rows of a band that has one halo row above and below
+def update_band(band, out_band, b1=3, b2=3, d1=2, d2=3, counts=None):
+    """
+    Apply the update_life_state_2 rules to rows 1..r of a band of shape (r + 2, m). Rows 0 and r + 1 are
+    halo rows copied from the neighboring bands (or dead rows at the grid border) and are only read.
+
+    IN:
+        band (ndarray of shape (r + 2, m)): the current state of the band and its halo rows.
+        out_band (ndarray of shape (r + 2, m)): array whose rows 1..r receive the next state.
+        b1, b2, d1, d2 (int): the custom bounds, see update_life_state_2.
+        counts (ndarray of shape (r, m), optional): pre-allocated buffer for the neighbor counts.
+
+    OUT:
+        out_band (ndarray of shape (r + 2, m)): the band with its interior rows updated.
+    """
+    rows, m = band.shape[0] - 2, band.shape[1]
+    if counts is None:
+        counts = np.empty((rows, m), dtype=np.uint8)
+    counts[...] = 0
+    for di, dj in NEIGHBORS:
+        counts[:, max(-dj, 0):m - max(dj, 0)] += band[1 + di:1 + di + rows, max(dj, 0):m - max(-dj, 0)]
+    born = (b1 <= counts) & (counts <= b2)
+    survives = (d1 <= counts) & (counts <= d2)
+    np.copyto(out_band[1:-1], np.where(band[1:-1] == 0, born, survives))
+    return out_band
+
+
+#helper function that opens the two shared buffers of a band as ndarrays
+def _attach_band(names, shape):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    arrays = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in blocks]
+    return blocks, arrays
+
+
+#helper function run by every worker process: steps one band and pushes its edge rows into the neighbors' halos
+def _band_worker(index, band_names, band_shapes, num_iterations, rules, barrier):
+    opened = []
+    try:
+        blocks, own = _attach_band(band_names[index], band_shapes[index])
+        opened += blocks
+        up = down = None
+        if index > 0:
+            blocks, up = _attach_band(band_names[index - 1], band_shapes[index - 1])
+            opened += blocks
+        if index < len(band_names) - 1:
+            blocks, down = _attach_band(band_names[index + 1], band_shapes[index + 1])
+            opened += blocks
+
+        counts = np.empty((band_shapes[index][0] - 2, band_shapes[index][1]), dtype=np.uint8)
+        for iteration in range(num_iterations):
+            # Read from one buffer and write the other, the buffers swap every generation
+            read, write = iteration % 2, 1 - iteration % 2
+            update_band(own[read], own[write], *rules, counts=counts)
+            # Halo exchange: the neighbors read these rows only after the barrier
+            if up is not None:
+                up[write][-1] = own[write][1]
+            if down is not None:
+                down[write][0] = own[write][-2]
+            barrier.wait()
+    except Exception:
+        # Release the other workers instead of leaving them waiting at the barrier
+        barrier.abort()
+        raise
+    finally:
+        # The arrays must be dropped before their shared memory can be closed
+        own = up = down = None
+        for block in opened:
+            block.close()
+
+
+def play_life_state_parallel(life_state, num_iterations, b1=3, b2=3, d1=2, d2=3, num_workers=None):
+    """
+    Run several generations of update_life_state_2 on a large grid split into row bands, one worker process
+    per band. Every band lives in two shared memory buffers (current and next generation) with one halo row on
+    each side, and the workers only exchange those halo rows each generation.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the initial state of the grid (0 is dead, 1 is alive).
+        num_iterations (int): number of generations to run.
+        b1, b2, d1, d2 (int): the custom bounds, see update_life_state_2.
+        num_workers (int, optional): number of bands/worker processes. If None, one per CPU core.
+
+    OUT:
+        ndarray of shape (n, m): the grid after num_iterations generations, with the same dtype as life_state.
+    """
+    n, m = life_state.shape
+    if num_workers is None:
+        num_workers = mp.cpu_count()
+    num_workers = max(1, min(num_workers, n))
+    bounds = np.linspace(0, n, num_workers + 1).astype(int)
+
+    blocks, band_names, band_shapes, bands = [], [], [], []
+    try:
+        # Two zeroed buffers per band; the halo rows at the grid border stay dead forever
+        for top, bottom in zip(bounds[:-1], bounds[1:]):
+            shape = (bottom - top + 2, m)
+            pair = [shared_memory.SharedMemory(create=True, size=max(1, shape[0] * m)) for _ in range(2)]
+            blocks += pair
+            arrays = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in pair]
+            for array in arrays:
+                array[...] = 0
+            # Fill the interior and the halo rows of the first buffer from the grid
+            arrays[0][max(0, 1 - top):shape[0] - max(0, bottom + 1 - n)] = \
+                life_state[max(0, top - 1):min(n, bottom + 1)] != 0
+            band_names.append([block.name for block in pair])
+            band_shapes.append(shape)
+            bands.append(arrays)
+
+        barrier = mp.Barrier(num_workers)
+        rules = (b1, b2, d1, d2)
+        workers = [mp.Process(target=_band_worker, args=(index, band_names, band_shapes, num_iterations, rules, barrier))
+                   for index in range(num_workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if any(worker.exitcode != 0 for worker in workers):
+            raise RuntimeError("A worker process failed while stepping its band.")
+
+        # Gather the interiors of the buffer that holds the last generation
+        final = num_iterations % 2
+        out_life_state = np.empty_like(life_state)
+        for (top, bottom), arrays in zip(zip(bounds[:-1], bounds[1:]), bands):
+            out_life_state[top:bottom] = arrays[final][1:-1]
+        return out_life_state
+    finally:
+        # The arrays must be dropped before their shared memory can be closed
+        bands.clear()
+        arrays = array = None
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,278 @@
+import os
+import re
+
+import numpy as np
+
+#how many characters of a pattern file are parsed at a time
+CHUNK_SIZE = 1 << 16
+#longest line written to an RLE file, as recommended by the format
+RLE_LINE_LENGTH = 70
+
+_RLE_TOKEN = re.compile(r'(\d*)([A-Za-z.$!])')
+_RLE_HEADER_ITEM = re.compile(r'\s*(\w+)\s*=\s*([^,]+)')
+
+
+def parse_rule_string(rule):
+    """
+    Turn a B/S rule string such as "B3/S23" (or the older "23/3" S/B form) into the level 2 bounds.
+    The birth and survival counts must each be one unbroken range, e.g. B36/S23 cannot be played by level 2.
+
+    IN:
+        rule (str): the rule string.
+
+    OUT:
+        dict: {'b1': ..., 'b2': ..., 'd1': ..., 'd2': ...}, the same form save_rules_to_json writes.
+    """
+    text = rule.strip().upper()
+    match = re.fullmatch(r'B(\d*)/S(\d*)|S(\d*)/B(\d*)|(\d*)/(\d*)', text)
+    if match is None:
+        raise ValueError(f"Cannot read the rule {rule!r}, expected something like B3/S23.")
+    if match.group(5) is not None or match.group(6) is not None:
+        survive, birth = match.group(5), match.group(6)
+    elif match.group(1) is not None or match.group(2) is not None:
+        birth, survive = match.group(1), match.group(2)
+    else:
+        survive, birth = match.group(3), match.group(4)
+
+    bounds = []
+    for name, digits in [('birth', birth), ('survival', survive)]:
+        counts = sorted({int(digit) for digit in digits})
+        if not counts:
+            raise ValueError(f"The rule {rule!r} has no {name} counts, which level 2 cannot express.")
+        if counts != list(range(counts[0], counts[-1] + 1)):
+            raise ValueError(f"The {name} counts of {rule!r} are not one range, which level 2 cannot express.")
+        bounds += [counts[0], counts[-1]]
+    return {'b1': bounds[0], 'b2': bounds[1], 'd1': bounds[2], 'd2': bounds[3]}
+
+
+def format_rule_string(b1=3, b2=3, d1=2, d2=3):
+    """
+    Turn the level 2 bounds into a B/S rule string, e.g. (3, 3, 2, 3) -> "B3/S23".
+    IN:
+        b1, b2, d1, d2 (int): the custom bounds, see update_life_state_2.
+    OUT:
+        str: the rule string.
+    """
+    birth = ''.join(str(count) for count in range(b1, b2 + 1))
+    survive = ''.join(str(count) for count in range(d1, d2 + 1))
+    return f"B{birth}/S{survive}"
+
+
+#helper function that returns the grid to read a pattern of shape (height, width) into, and checks it fits
+def _target_grid(life_state, height, width, row, col):
+    if life_state is None:
+        return np.zeros((height + row, width + col), dtype=np.uint8)
+    if row < 0 or col < 0 or row + height > life_state.shape[0] or col + width > life_state.shape[1]:
+        raise ValueError(f"A {height}x{width} pattern at ({row}, {col}) does not fit in a grid of shape "
+                         f"{life_state.shape}.")
+    return life_state
+
+
+def read_rle(filename, life_state=None, row=0, col=0, chunk_size=CHUNK_SIZE):
+    """
+    Read a run-length encoded (.rle) Life pattern. The file is parsed chunk by chunk and every run of alive
+    cells is written straight into the grid, so big patterns never exist as text or as a list of cells in memory.
+
+    IN:
+        filename (str): the RLE file.
+        life_state (ndarray of shape (n, m), optional): grid to draw the pattern into (only alive cells are set),
+                                                        e.g. np.zeros or a memmap. A grid of the pattern's size is
+                                                        created if None.
+        row, col (int): where the top-left corner of the pattern goes in the grid.
+        chunk_size (int): number of characters parsed at a time.
+
+    OUT:
+        (life_state, rules): the grid, and the rule of the file as {'b1', 'b2', 'd1', 'd2'} (None if the file
+                             has no rule).
+    """
+    with open(filename, 'r') as file:
+        # Comment lines (#N name, #C comment, ...) come first, then the "x = 3, y = 3, rule = B3/S23" header
+        line = file.readline()
+        while line.startswith('#') or (line and not line.strip()):
+            line = file.readline()
+        header = dict((key.lower(), value.strip()) for key, value in _RLE_HEADER_ITEM.findall(line))
+        if 'x' not in header or 'y' not in header:
+            raise ValueError(f"{filename} has no 'x = ..., y = ...' header line.")
+        width, height = int(header['x']), int(header['y'])
+        rules = parse_rule_string(header['rule']) if 'rule' in header else None
+        life_state = _target_grid(life_state, height, width, row, col)
+
+        i = j = 0
+        leftover = ''
+        done = False
+        while not done:
+            chunk = file.read(chunk_size)
+            text = leftover + re.sub(r'\s+', '', chunk)
+            position = 0
+            for match in _RLE_TOKEN.finditer(text):
+                if match.start() != position:
+                    raise ValueError(f"Unexpected {text[position:match.start()]!r} in {filename}.")
+                position = match.end()
+                count = int(match.group(1)) if match.group(1) else 1
+                tag = match.group(2)
+                if tag == '!':
+                    done = True
+                    break
+                if tag == '$':
+                    i, j = i + count, 0
+                    continue
+                if i >= height or j + count > width:
+                    raise ValueError(f"{filename} has cells outside its {width}x{height} header.")
+                # 'b' and '.' are dead cells, 'o' (or any other state letter) is alive
+                if tag not in 'b.':
+                    life_state[row + i, col + j:col + j + count] = 1
+                j += count
+            leftover = text[position:]
+            if not chunk:
+                if leftover and not done:
+                    raise ValueError(f"{filename} ends in the middle of a run.")
+                break
+    return life_state, rules
+
+
+#helper function that writes tokens to a file, starting a new line before one gets longer than line_length
+def _write_tokens(file, tokens, line, line_length):
+    for token in tokens:
+        if len(line) + len(token) > line_length:
+            file.write(line + '\n')
+            line = ''
+        line += token
+    return line
+
+
+#helper function that returns the (start, stop) columns of every run of alive cells in a row
+def _alive_runs(cells):
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], cells != 0, [False])).astype(np.int8)))
+    return edges[0::2], edges[1::2]
+
+
+def write_rle(life_state, filename, rules=None, name=None, line_length=RLE_LINE_LENGTH):
+    """
+    Save a grid as a run-length encoded (.rle) Life pattern, one row at a time.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the grid, any non-zero cell is alive.
+        filename (str): the RLE file to write.
+        rules (dict, optional): {'b1', 'b2', 'd1', 'd2'} written as the B/S rule of the file.
+        name (str, optional): pattern name written as a #N line.
+        line_length (int): longest line of the file.
+
+    OUT: None
+    """
+    n, m = life_state.shape
+    with open(filename, 'w') as file:
+        if name:
+            file.write(f"#N {name}\n")
+        header = f"x = {m}, y = {n}"
+        if rules is not None:
+            header += f", rule = {format_rule_string(rules['b1'], rules['b2'], rules['d1'], rules['d2'])}"
+        file.write(header + '\n')
+
+        line = ''
+        last_row = 0
+        for i in range(n):
+            starts, stops = _alive_runs(life_state[i])
+            if len(starts) == 0:
+                continue
+            tokens = []
+            # Empty rows are skipped: one "<count>$" moves down to the next row with cells
+            if i > last_row:
+                tokens.append(f"{i - last_row}$" if i - last_row > 1 else '$')
+            last_row = i
+            previous = 0
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                if start > previous:
+                    tokens.append(f"{start - previous}b" if start - previous > 1 else 'b')
+                tokens.append(f"{stop - start}o" if stop - start > 1 else 'o')
+                previous = stop
+            line = _write_tokens(file, tokens, line, line_length)
+        line = _write_tokens(file, ['!'], line, line_length)
+        file.write(line + '\n')
+
+
+def read_plaintext(filename, life_state=None, row=0, col=0):
+    """
+    Read a plaintext (.cells) Life pattern: '!' comment lines, then one line per row with 'O' for alive
+    and '.' for dead cells. The file is read line by line.
+
+    IN:
+        filename (str): the plaintext file.
+        life_state (ndarray of shape (n, m), optional): grid to draw the pattern into (only alive cells are set).
+                                                        A grid of the pattern's size is created if None.
+        row, col (int): where the top-left corner of the pattern goes in the grid.
+
+    OUT:
+        ndarray: the grid.
+    """
+    if life_state is None:
+        # Plaintext has no header, so find the size in a first pass over the file
+        height, width = get_pattern_size(filename)
+        life_state = _target_grid(None, height, width, row, col)
+
+    with open(filename, 'r') as file:
+        i = 0
+        for line in file:
+            if line.startswith('!'):
+                continue
+            cells = np.frombuffer(line.rstrip('\r\n').encode(), dtype=np.uint8)
+            alive = (cells != ord('.')) & (cells != ord(' '))
+            if len(cells) and (row + i >= life_state.shape[0] or col + len(cells) > life_state.shape[1]):
+                raise ValueError(f"The pattern in {filename} does not fit in a grid of shape {life_state.shape}.")
+            if alive.any():
+                life_state[row + i, col:col + len(cells)][alive] = 1
+            i += 1
+    return life_state
+
+
+def write_plaintext(life_state, filename, name=None):
+    """
+    Save a grid as a plaintext (.cells) Life pattern, one line per row.
+    IN:
+        life_state (ndarray of shape (n, m)): the grid, any non-zero cell is alive.
+        filename (str): the plaintext file to write.
+        name (str, optional): pattern name written as a "!Name:" line.
+    OUT: None
+    """
+    with open(filename, 'w') as file:
+        if name:
+            file.write(f"!Name: {name}\n")
+        for cells in life_state:
+            file.write(''.join(np.where(cells != 0, 'O', '.')) + '\n')
+
+
+def load_pattern(filename, life_state=None, row=0, col=0):
+    """
+    Read a .rle or plaintext (.cells, .txt) pattern file, chosen by its extension.
+    IN:
+        filename (str): the pattern file.
+        life_state (ndarray, optional), row, col (int): where to draw the pattern, see read_rle.
+    OUT:
+        (life_state, rules): the grid and the rule of the file (None for plaintext or RLE without a rule).
+    """
+    if os.path.splitext(filename)[1].lower() == '.rle':
+        return read_rle(filename, life_state, row, col)
+    return read_plaintext(filename, life_state, row, col), None
+
+
+def get_pattern_size(filename):
+    """
+    Read only the size of a pattern file.
+    IN:
+        filename (str): the .rle or plaintext pattern file.
+    OUT:
+        (height, width) of the pattern.
+    """
+    if os.path.splitext(filename)[1].lower() == '.rle':
+        with open(filename, 'r') as file:
+            for line in file:
+                if not line.startswith('#') and line.strip():
+                    header = dict((key.lower(), value.strip()) for key, value in _RLE_HEADER_ITEM.findall(line))
+                    return int(header['y']), int(header['x'])
+        raise ValueError(f"{filename} has no 'x = ..., y = ...' header line.")
+    height = width = 0
+    with open(filename, 'r') as file:
+        for line in file:
+            if not line.startswith('!'):
+                height += 1
+                width = max(width, len(line.rstrip('\r\n')))
+    return height, width
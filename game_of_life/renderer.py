@@ -0,0 +1,123 @@
+import numpy as np
+
+from .instrumentation import phase
+
+#matplotlib is imported inside the drawing functions, so the engines and batch runs never load it
+
+#largest side of a figure in inches, so big boards still fit on the screen
+MAX_FIGURE_SIZE = 8
+#boards up to this many cells wide get black lines between the cells
+MAX_CELL_BORDERS = 64
+
+#open windows by title: (figure, image, style) so the next generation only updates the image data
+_windows = {}
+
+
+def get_colormap(colors, num_states=None):
+    """
+    Build a colormap where state s is drawn in colors[s].
+
+    IN:
+        colors (dict or list): color of each state, e.g. the level-3 {state: color} dict.
+        num_states (int, optional): number of states to cover; states without a color are white.
+
+    OUT:
+        ListedColormap with one color per state 0 .. num_states - 1.
+    """
+    from matplotlib.colors import ListedColormap
+
+    if isinstance(colors, dict):
+        if num_states is None:
+            num_states = max(colors) + 1
+        table = [colors.get(state, 'white') for state in range(num_states)]
+    else:
+        table = list(colors) + ['white'] * max(0, (num_states or 0) - len(colors))
+    return ListedColormap(table)
+
+
+def draw_grid(life_state, colors, title='Game of Life', origin='upper', alpha=None, pause=0.001):
+    """
+    Draw the whole grid as a single image. The first call opens a window; later calls with the same title
+    reuse it and only replace the image data, so every generation costs one redraw instead of n*m polygons.
+
+    IN:
+        life_state (ndarray of shape (n, m)): the states of the cells.
+        colors (dict or list): color of each state, see get_colormap.
+        title (str): window title, one window is kept per title.
+        origin (str): 'upper' puts row 0 at the top, 'lower' puts it at the bottom.
+        alpha (float, optional): transparency of the cells.
+        pause (float): seconds to let the window refresh.
+
+    OUT:
+        None (it will plot the state using matplotlib).
+    """
+    with phase('draw'):
+        _draw_grid(life_state, colors, title, origin, alpha, pause)
+
+
+#helper function that draws (or updates) the window for draw_grid
+def _draw_grid(life_state, colors, title, origin, alpha, pause):
+    import matplotlib.pyplot as plt
+
+    n, m = life_state.shape
+    style = (repr(colors), origin, alpha)
+    figure, image, window_style = _windows.get(title, (None, None, None))
+    if figure is None or not plt.fignum_exists(figure.number) or image.get_array().shape != (n, m) or window_style != style:
+        # A different board size or color scheme needs a new window
+        if figure is not None:
+            plt.close(figure)
+        plt.ion()
+        num_states = max(int(life_state.max(initial=0)) + 1, max(colors) + 1 if isinstance(colors, dict) else len(colors))
+        scale = min(0.5, MAX_FIGURE_SIZE / max(n, m))
+        figure, axes = plt.subplots(figsize=(max(m * scale, 2), max(n * scale, 2)))
+        image = axes.imshow(life_state, cmap=get_colormap(colors, num_states), vmin=-0.5, vmax=num_states - 0.5,
+                            origin=origin, alpha=alpha, interpolation='nearest')
+        # Cell borders are only readable (and cheap) on small boards
+        if max(n, m) <= MAX_CELL_BORDERS:
+            axes.hlines(np.arange(n + 1) - 0.5, -0.5, m - 0.5, color='black', linewidth=0.5)
+            axes.vlines(np.arange(m + 1) - 0.5, -0.5, n - 0.5, color='black', linewidth=0.5)
+        axes.set_title(title)
+        axes.axis('off')
+        _windows[title] = (figure, image, style)
+    else:
+        image.set_data(life_state)
+    figure.canvas.draw_idle()
+    plt.pause(pause)
+
+
+def draw_life_state_1(life_state):
+    """
+    Display the 2D positions of the selected collection of cells (2D points).
+    IN:
+        life_state, ndarray of shape (n, m): Initial state of the cells.
+    OUT:
+        None (it will plot the state using matplotlib).
+    """
+    # Draw the whole grid as one image (dead cells light gray, alive cells black), reusing the open window
+    draw_grid(life_state != 0, ['lightgray', 'black'], title='Game of Life', origin='lower')
+
+
+def draw_life_state_2(life_state):
+    """
+    Display the 2D positions of the selected collection of cells (2D points).
+    IN:
+        life_state, ndarray of shape (n, m): Initial state of the cells.
+    OUT:
+        None (it will plot the state using matplotlib).
+    """
+    # Draw the whole grid as one image (dead cells light gray, alive cells black), reusing the open window
+    draw_grid(life_state != 0, ['lightgray', 'black'], title='Game of Life', origin='lower')
+
+
+def draw_life_state_3(life_state, colors):
+    """
+    Display the 2D grid of cells with their respective states and colors.
+    
+    IN:
+        life_state (ndarray): The state of the cells in the grid.
+        colors (list of str): List of colors corresponding to each state.
+    
+    OUT: None
+    """
+    # Draw the whole grid as one image colored by state, with (0,0) at the top-left, reusing the open window
+    draw_grid(life_state, colors, title='Game of Life', origin='upper', alpha=0.5)
@@ -0,0 +1,322 @@
+import random
+
+import numpy as np
+
+from .instrumentation import phase
+from .statistics import record_generation
+
+
+def init_life_state_3(n, m, p_list, states):
+    """
+    Generate an initial random subset of non-binary cells with specified probabilities.
+    
+    IN: 
+        n (int): Number of rows.
+        m (int): Number of columns.
+        p_list (list of float): List of probabilities for each state.
+        states (list of int): List of possible states for the cells.
+    
+    OUT: 
+        ndarray of shape (n, m): Initial state of the cells.
+    """
+    # Ensure probabilities sum to 1
+    assert np.isclose(np.sum(p_list), 1), "Probabilities must sum to 1."
+
+    # Generate a random array of states based on the given probabilities
+    life_state = np.random.choice(states, size=(n, m), p=p_list)
+    return life_state
+
+
+#helper function that returns the number of neighbors that match the given type
+def get_neighbors(life_state, i, j, n, m, type):
+    neighbors_offsets = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+    count_of_type = 0;
+    for di, dj in neighbors_offsets:
+        ni, nj = i + di, j + dj
+        if 0 <= ni < n and 0 <= nj < m:
+            if life_state[ni, nj] == type:
+                count_of_type += 1
+    return count_of_type
+
+
+#helper function that uses the probabilities to decide which state to return
+def handle_probabilities_rule(rule, current_state = 0):
+    dict_of_probs = {}
+    prev_value = 0
+    for prob in rule:
+        dict_of_probs[prob['then']["turn_to"] ] = prev_value + prob['value']
+
+    #sort the probabilities in ascending order based on value
+    dict_of_probs = {k: v for k, v in sorted(dict_of_probs.items())}
+    #make it so that each value is the sum of all previous values
+    for turn_to, prob in dict_of_probs.items():
+        dict_of_probs[turn_to] = prob + prev_value
+        prev_value = prob+prev_value
+
+    random_value = random.uniform(0, 1)
+    for ret, prob in dict_of_probs.items():
+        if random_value < prob:
+            return ret
+    
+    return "error"
+
+
+def update_life_state_3(life_state, rules_dict, out_life_state=None):
+    """
+    Update the grid based on the rules specified for each state (could be any arbitrary state and rule).
+    
+    IN: 
+        life_state (ndarray): 2D array representing the current state of the cells.
+        rules_dict (dict): The dictionary containing the rules for updating the cells.
+        out_life_state (ndarray, optional): 2D array to store the next state. If None, a new array is created.
+        
+    OUT: 
+        ndarray: The updated 2D array representing the next state of the cells.
+    """
+    n, m = life_state.shape  # Get the grid dimensions
+    
+    if out_life_state is None:
+        out_life_state = np.copy(life_state)  # Initialize the output state with the current state
+
+    # Iterate over each cell in the grid
+    for i in range(n):
+        for j in range(m):
+            current_state = life_state[i, j]  # Current state of the cell
+            # Get the rules for the current state of the cell
+            if current_state in rules_dict:  # Check if the current state is in the rules_dict:
+                rules = rules_dict[current_state]
+                for rule in rules:
+                    # Handle neighbor-based transitions (if applicable)
+                    if 'neighbor_to' in rule:
+                        curr_rule = rule['neighbor_to']
+                        curr_rule_if = curr_rule['if']
+                        curr_rule_then = curr_rule['then']
+                        #checks if the number of neighbors is within the range
+                        neighbors = get_neighbors(life_state, i, j, n, m, current_state)
+                        if neighbors >= curr_rule_if[0]['at_least'] and neighbors <= curr_rule_if[0]['at_most']:
+                            curr_rule = curr_rule_then
+                            # Handle probability-based transitions in neighbor-based transitions
+                            if 'probability' in curr_rule:
+                                probabilitys = curr_rule['probability']
+                                out_life_state[i, j] = handle_probabilities_rule(probabilitys ,current_state)
+                            # Handle turn-to transitions in neighbor-based transitions
+                            elif 'turn_to' in curr_rule:
+                                out_life_state[i, j] = curr_rule['turn_to']
+                    # Handle probability-based transitions
+                    elif 'probability' in rule:
+                        probabilitys = rule['probability']
+                        out_life_state[i, j] = handle_probabilities_rule(probabilitys)
+                    # Handle turn-to transitions
+                    elif 'turn_to' in rule:
+                        out_life_state[i, j] = rule['turn_to']
+                        
+    #returns the updated life_state
+    return out_life_state
+
+
+#helper function that returns, for every cell at once, the number of neighbors of each of the given states
+def get_neighbors_tensor(life_state, states, out_counts=None, out_one_hot=None):
+    """
+    Vectorized get_neighbors for several types at once: one-hot encode the grid one state at a time and sum the
+    8 shifted slices of the encoding. Cells outside the grid are not counted.
+    A stack of grids of shape (..., n, m), e.g. (R, n, m) replicas, is handled in the same pass.
+
+    IN:
+        life_state (ndarray of shape (..., n, m)): array representing the current state of the cells.
+        states (list of int): the states to count, e.g. range(num_states).
+        out_counts (ndarray of shape (len(states), ..., n, m), optional): a pre-allocated uint8 array for the counts,
+                                                                          reused across generations. If None, a new array is created.
+        out_one_hot (ndarray of shape (..., n, m), optional): a pre-allocated bool array for the one-hot encoding of
+                                                              one state, reused across generations. If None, a new
+                                                              array is created.
+
+    OUT:
+        out_counts (ndarray of shape (len(states), ..., n, m)): out_counts[k, ..., i, j] is the number of neighbors
+                                                                of (i, j) in states[k].
+    """
+    n, m = life_state.shape[-2:]
+    if out_counts is None:
+        out_counts = np.empty((len(states),) + life_state.shape, dtype=np.uint8)
+    if out_one_hot is None:
+        out_one_hot = np.empty(life_state.shape, dtype=bool)
+
+    out_counts[...] = 0
+    neighbors_offsets = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+    for counts, state in zip(out_counts, states):
+        one_hot = np.equal(life_state, state, out=out_one_hot)
+        for di, dj in neighbors_offsets:
+            counts[..., max(-di, 0):n - max(di, 0), max(-dj, 0):m - max(dj, 0)] += \
+                one_hot[..., max(di, 0):n - max(-di, 0), max(dj, 0):m - max(-dj, 0)]
+    return out_counts
+
+
+#helper function that turns one probability list into the states it can pick and their cumulative probabilities
+def compile_probabilities_rule(rule):
+    """
+    Precompute the distribution used by handle_probabilities_rule: the states sorted by value and the
+    running sum of their probabilities.
+
+    IN:
+        rule (list of dict): the "probability" list of a rule, each entry has a "value" and a "then": {"turn_to": state}.
+
+    OUT:
+        choices (ndarray of int): the states that can be picked.
+        cumulative (ndarray of float): cumulative probability of each choice.
+    """
+    dict_of_probs = {}
+    for prob in rule:
+        dict_of_probs[prob['then']['turn_to']] = prob['value']
+    choices = np.array(sorted(dict_of_probs), dtype=np.int_)
+    cumulative = np.cumsum([dict_of_probs[state] for state in choices])
+    return choices, cumulative
+
+
+def compile_rules(rules_dict):
+    """
+    Compile a rules dictionary (for example from load_rules_from_json) into a flat program that
+    update_life_state_3_compiled can run on the whole grid at once.
+
+    Every entry of a "neighbor_to" "if" list must hold for the rule to apply, and each entry counts the
+    neighbors of its own "type" (the cell's own state if "type" is missing).
+
+    IN:
+        rules_dict (dict): The dictionary containing the rules for each state (keys may be int or str).
+
+    OUT:
+        list of dict: one instruction per rule, in the order they are applied. Each instruction has a "state",
+                      an "if" list of (type, at_least, at_most) tuples and either a "turn_to" state or
+                      "choices" and "cumulative" arrays for a probability branch.
+    """
+    program = []
+    for state, rules in rules_dict.items():
+        state = int(state)
+        for rule in rules:
+            conditions = []
+            # Handle neighbor-based transitions (if applicable)
+            if 'neighbor_to' in rule:
+                for condition in rule['neighbor_to']['if']:
+                    conditions.append((int(condition.get('type', state)),
+                                       condition.get('at_least', 0),
+                                       condition.get('at_most', 8)))
+                rule = rule['neighbor_to']['then']
+
+            instruction = {'state': state, 'if': conditions}
+            if 'probability' in rule:
+                instruction['choices'], instruction['cumulative'] = compile_probabilities_rule(rule['probability'])
+            elif 'turn_to' in rule:
+                instruction['turn_to'] = int(rule['turn_to'])
+            else:
+                continue
+            program.append(instruction)
+    return program
+
+
+#helper function that returns the neighbor types a compiled program counts
+def get_program_types(program):
+    return sorted({type for instruction in program for type, at_least, at_most in instruction['if']})
+
+
+def update_life_state_3_compiled(life_state, program, out_life_state=None, neighbor_counts=None, rng=None,
+                                 statistics=None, one_hot=None):
+    """
+    Update the grid by running a program from compile_rules on every cell at once.
+    A stack of grids of shape (..., n, m) is updated in the same pass, each grid independently.
+
+    IN:
+        life_state (ndarray): 2D array (or stack of 2D arrays) representing the current state of the cells.
+        program (list of dict): The compiled rules from compile_rules.
+        out_life_state (ndarray, optional): 2D array to store the next state. If None, a new array is created.
+        neighbor_counts (ndarray, optional): a pre-allocated buffer for get_neighbors_tensor, reused across generations.
+                                             If None (or the wrong shape), a new array is created.
+        rng (np.random.Generator or int, optional): source of the random draws. Pass the same Generator every
+                                                    generation for a reproducible run; an int seeds a new Generator.
+        statistics (dict, optional): a collector from statistics.create_statistics (2D grids only) that records
+                                     the number of cells in every state and the transitions of the new generation.
+                                     The transitions are counted from the rules, so out_life_state must start as a
+                                     copy of life_state (as it does when it is None).
+        one_hot (ndarray, optional): a pre-allocated bool buffer of the shape of life_state for get_neighbors_tensor,
+                                     reused across generations. If None (or the wrong shape), a new array is created.
+
+    OUT:
+        ndarray: The updated 2D array representing the next state of the cells.
+    """
+    rng = np.random.default_rng(rng)
+    if out_life_state is None:
+        out_life_state = np.copy(life_state)  # Initialize the output state with the current state
+
+    # Neighbor counts of every type used by the rules are computed in one pass and shared by all rules
+    types = get_program_types(program)
+    if types:
+        if neighbor_counts is None or neighbor_counts.shape != (len(types),) + life_state.shape:
+            neighbor_counts = None
+        if one_hot is None or one_hot.shape != life_state.shape:
+            one_hot = None
+        with phase('count_neighbors'):
+            neighbor_counts = get_neighbors_tensor(life_state, types, neighbor_counts, one_hot)
+    type_index = {type: k for k, type in enumerate(types)}
+
+    # Find the cells each rule applies to
+    with phase('match_rules'):
+        state_masks = {}
+        rule_masks = []
+        for instruction in program:
+            state = instruction['state']
+            if state not in state_masks:
+                state_masks[state] = life_state == state
+            mask = state_masks[state]
+
+            #checks if the number of neighbors of each type is within the range
+            for type, at_least, at_most in instruction['if']:
+                neighbors = neighbor_counts[type_index[type]]
+                mask = mask & (neighbors >= at_least) & (neighbors <= at_most)
+            rule_masks.append(mask)
+
+    # Draw the random values of every cell of every probability rule in a single call
+    with phase('sample'):
+        sampled_cells = [np.nonzero(mask) if 'cumulative' in instruction else None
+                         for instruction, mask in zip(program, rule_masks)]
+        draws = rng.random(sum(len(cells[0]) for cells in sampled_cells if cells is not None))
+
+    # Transitions counted rule by rule while applying them: every cell of a rule is in the rule's state, so
+    # changes[state] gets the new states, minus the states earlier rules of that state gave to the same cells
+    if statistics is not None:
+        num_states = statistics['num_states']
+        changes = np.zeros((num_states, num_states), dtype=np.int64)
+    overwritten_states = set()
+
+    # Apply the rules in order, later rules overwrite earlier ones
+    with phase('apply_rules'):
+        start = 0
+        for instruction, mask, cells in zip(program, rule_masks, sampled_cells):
+            state = instruction['state']
+            if 'turn_to' in instruction:
+                targets = mask
+                if statistics is not None:
+                    changes[state, instruction['turn_to']] += np.count_nonzero(mask)
+            else:
+                # Pick the state whose cumulative probability the cell's draw falls in
+                num_cells = len(cells[0])
+                picks = np.searchsorted(instruction['cumulative'], draws[start:start + num_cells], side='right')
+                start += num_cells
+                # Probabilities that add up to less than 1 leave the remaining cells unchanged
+                picked = picks < len(instruction['choices'])
+                targets = tuple(index[picked] for index in cells)
+                if statistics is not None:
+                    changes[state, instruction['choices']] += np.bincount(picks[picked],
+                                                                          minlength=len(instruction['choices']))
+            if statistics is not None and state in overwritten_states:
+                # Undo what an earlier rule of the same state counted for the cells this rule overwrites
+                changes[state] -= np.bincount(out_life_state[targets].astype(np.intp), minlength=num_states)
+            overwritten_states.add(state)
+            if 'turn_to' in instruction:
+                out_life_state[targets] = instruction['turn_to']
+            else:
+                out_life_state[targets] = instruction['choices'][picks[picked]]
+
+    if statistics is not None:
+        with phase('statistics'):
+            # Cells left in their own state are on the diagonal, which is not a change
+            np.fill_diagonal(changes, 0)
+            record_generation(statistics, out_life_state, changes=changes)
+
+    return out_life_state
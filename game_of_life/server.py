@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from .batch import DEFAULT_CONFIG as BATCH_CONFIG, setup_level
+
+#settings of a streamed run: the batch settings plus where to listen and how fast to run
+DEFAULT_CONFIG = {
+    **BATCH_CONFIG,
+    'iterations': None,       # None = run until the server is stopped
+    'host': '127.0.0.1',      # only this machine can connect; use an SSH tunnel to watch from elsewhere
+    'port': 8765,
+    'fps': 10,                # generations per second, 0 = as fast as the engine goes
+    'compression_level': 1,
+}
+
+#every frame sent to a viewer is one binary WebSocket message:
+#   header: kind (keyframe or delta), generation, rows, columns, bits per cell (1 or 8)
+#   payload: zlib of the cells (bit-packed for 2 states, one byte per cell otherwise) for a keyframe,
+#            or of the XOR with the last frame that viewer received for a delta
+KEYFRAME, DELTA = 0, 1
+FRAME_HEADER = struct.Struct('<BIIIB')
+_WEBSOCKET_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+_CLOSE, _PING, _PONG = 0x8, 0x9, 0xA
+
+#page served at / that draws the frames in a browser; any other WebSocket client can read /frames instead
+VIEWER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Game of Life</title>
+<style>
+body { font-family: sans-serif; }
+canvas { image-rendering: pixelated; width: min(90vw, 90vh); border: 1px solid black; }
+</style>
+</head>
+<body>
+<div id="status">Connecting...</div>
+<canvas id="board" width="1" height="1"></canvas>
+<script>
+const PALETTE = [[211, 211, 211], [0, 0, 0], [220, 50, 47], [38, 139, 210], [133, 153, 0], [181, 137, 0],
+                 [108, 113, 196], [42, 161, 152]];
+const canvas = document.getElementById('board');
+const context = canvas.getContext('2d');
+const status = document.getElementById('status');
+const socket = new WebSocket(`ws://${location.host}/frames`);
+socket.binaryType = 'arraybuffer';
+let cells = null;
+let shown = [];
+// Decompressing is asynchronous, so frames are chained to keep them in order
+let pending = Promise.resolve();
+socket.onmessage = (event) => { pending = pending.then(() => show(event.data)); };
+socket.onclose = () => { status.textContent += ' (disconnected)'; };
+
+async function show(data) {
+  const header = new DataView(data);
+  const kind = header.getUint8(0), generation = header.getUint32(1, true);
+  const n = header.getUint32(5, true), m = header.getUint32(9, true), bits = header.getUint8(13);
+  const stream = new Blob([data.slice(14)]).stream().pipeThrough(new DecompressionStream('deflate'));
+  const payload = new Uint8Array(await new Response(stream).arrayBuffer());
+  if (kind === 0 || cells === null || cells.length !== payload.length) {
+    cells = payload;
+  } else {
+    for (let i = 0; i < cells.length; i++) cells[i] ^= payload[i];
+  }
+  if (canvas.width !== m || canvas.height !== n) { canvas.width = m; canvas.height = n; }
+  const image = context.createImageData(m, n);
+  for (let i = 0; i < n * m; i++) {
+    const state = bits === 1 ? (cells[i >> 3] >> (7 - (i & 7))) & 1 : cells[i];
+    const color = PALETTE[state % PALETTE.length];
+    image.data.set(color, 4 * i);
+    image.data[4 * i + 3] = 255;
+  }
+  context.putImageData(image, 0, 0);
+  const now = performance.now();
+  shown.push(now);
+  shown = shown.filter((time) => time > now - 1000);
+  status.textContent = `Generation ${generation}, ${shown.length} frames per second`;
+}
+</script>
+</body>
+</html>
+"""
+
+
+def encode_cells(life_state, num_states=2):
+    """
+    The bytes sent for a grid: bit-packed for two states, one byte per cell otherwise.
+    IN:
+        life_state (ndarray of shape (n, m)): the grid.
+        num_states (int): number of cell states (at most 256).
+    OUT:
+        ndarray of dtype uint8: the encoded cells.
+    """
+    if num_states == 2:
+        return np.packbits(life_state.ravel() != 0)
+    return life_state.ravel().astype(np.uint8)
+
+
+def decode_frame(message, previous_cells=None):
+    """
+    Decode one frame message, e.g. in a test client or another Python viewer.
+
+    IN:
+        message (bytes): the binary WebSocket message.
+        previous_cells (ndarray, optional): the encoded cells of the previous frame, needed for deltas.
+
+    OUT:
+        (generation, life_state, cells): the generation, the grid of shape (n, m) and dtype uint8, and the
+                                         encoded cells to pass as previous_cells with the next frame.
+    """
+    kind, generation, n, m, bits = FRAME_HEADER.unpack_from(message)
+    cells = np.frombuffer(zlib.decompress(message[FRAME_HEADER.size:]), dtype=np.uint8)
+    if kind == DELTA:
+        if previous_cells is None:
+            raise ValueError("A delta frame needs the cells of the previous frame.")
+        cells = np.bitwise_xor(previous_cells, cells)
+    if bits == 1:
+        life_state = np.unpackbits(cells, count=n * m).reshape(n, m)
+    else:
+        life_state = cells.reshape(n, m)
+    return generation, life_state, cells
+
+
+#helper function that builds the message that takes a viewer from its last frame to the newest one
+def _get_message(server, sent_generation, sent_cells):
+    generation, cells = server['latest']
+    # Viewers that are at the same generation get the same delta, so it is only compressed once
+    message = server['messages'].get(sent_generation)
+    if message is None:
+        if sent_cells is None:
+            kind, payload = KEYFRAME, cells
+        else:
+            kind, payload = DELTA, np.bitwise_xor(cells, sent_cells)
+        n, m = server['shape']
+        message = FRAME_HEADER.pack(kind, generation, n, m, server['bits'])
+        message += zlib.compress(payload.tobytes(), server['compression_level'])
+        server['messages'][sent_generation] = message
+    return generation, cells, message
+
+
+#helper function that builds the header of a WebSocket message sent by the server (servers never mask)
+def _websocket_header(opcode, length):
+    if length < 126:
+        return struct.pack('!BB', 0x80 | opcode, length)
+    if length < 1 << 16:
+        return struct.pack('!BBH', 0x80 | opcode, 126, length)
+    return struct.pack('!BBQ', 0x80 | opcode, 127, length)
+
+
+#helper function that reads one WebSocket message from a client, returns (opcode, payload)
+async def _read_websocket_message(reader):
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = (np.frombuffer(payload, dtype=np.uint8) ^ np.resize(np.frombuffer(mask, dtype=np.uint8),
+                                                                      length)).tobytes()
+    return first & 0x0F, payload
+
+
+#helper function that answers pings and notices when the viewer goes away
+async def _read_viewer(reader, writer, viewer):
+    try:
+        while True:
+            opcode, payload = await _read_websocket_message(reader)
+            if opcode == _CLOSE:
+                break
+            if opcode == _PING:
+                writer.write(_websocket_header(_PONG, len(payload)) + payload)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    viewer['closed'] = True
+    viewer['new_frame'].set()
+
+
+#helper function that streams frames to one viewer
+async def _send_frames(server, reader, writer):
+    viewer = {'new_frame': asyncio.Event(), 'closed': False}
+    server['viewers'].append(viewer)
+    reading = asyncio.create_task(_read_viewer(reader, writer, viewer))
+    # Wait for each frame to leave the process before picking the next, so a viewer never gets a backlog
+    writer.transport.set_write_buffer_limits(high=0)
+    sent_generation, sent_cells = None, None
+    try:
+        while not viewer['closed']:
+            if server['latest'] is None or server['latest'][0] == sent_generation:
+                if server['finished']:
+                    break
+                viewer['new_frame'].clear()
+                await viewer['new_frame'].wait()
+                continue
+            sent_generation, sent_cells, message = _get_message(server, sent_generation, sent_cells)
+            writer.write(_websocket_header(0x2, len(message)) + message)
+            # Only this viewer waits for its socket: a slow viewer skips to the newest generation
+            # while the simulation and the other viewers go on
+            await writer.drain()
+        if not viewer['closed']:
+            writer.write(_websocket_header(_CLOSE, 0))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        server['viewers'].remove(viewer)
+        reading.cancel()
+
+
+#helper function that answers one HTTP connection: the viewer page, or a WebSocket of frames
+async def _handle_connection(server, reader, writer):
+    try:
+        request = await reader.readuntil(b'\r\n\r\n')
+        lines = request.decode('latin-1').split('\r\n')
+        method, path = lines[0].split(' ')[:2]
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+
+        if method == 'GET' and path == '/frames' and headers.get('upgrade', '').lower() == 'websocket':
+            accept = base64.b64encode(hashlib.sha1(headers['sec-websocket-key'].encode() + _WEBSOCKET_GUID)
+                                      .digest()).decode()
+            writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+            await _send_frames(server, reader, writer)
+        elif method == 'GET' and path in ('/', '/index.html'):
+            body = VIEWER_PAGE.encode()
+            writer.write(("HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                          f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body)
+        else:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError, KeyError):
+        pass
+    finally:
+        writer.close()
+
+
+#helper function that publishes a new generation to every viewer
+def _publish(server, generation, life_state):
+    server['latest'] = (generation, encode_cells(life_state, server['num_states']))
+    server['messages'] = {}
+    for viewer in server['viewers']:
+        viewer['new_frame'].set()
+
+
+async def serve_life_state(config, started=None):
+    """
+    Run a simulation and stream its frames to every viewer that connects, until config['iterations']
+    generations are done (or forever). Open http://host:port/ in a browser, or read ws://host:port/frames
+    with any WebSocket client and decode the messages with decode_frame.
+
+    The engine runs in a worker thread, so serving viewers never waits for it. Every viewer has its own
+    sender that waits for its own socket to drain: a slow viewer is sent the newest generation as a delta
+    from the last one it received, skipping the ones in between, and never holds back the simulation or
+    the other viewers.
+
+    IN:
+        config (dict): the settings, see DEFAULT_CONFIG (level, rows, columns, rules, ... as in batch mode).
+        started (asyncio.Future, optional): set to the (host, port) the server listens on once it is ready,
+                                            useful with port 0 to pick a free port.
+
+    OUT:
+        ndarray of shape (rows, columns): the last grid.
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    life_state, step, rules, num_states, rng = setup_level(config)
+    if num_states > 256:
+        raise ValueError("Frames can only hold up to 256 cell states.")
+    server = {
+        'shape': life_state.shape,
+        'num_states': max(num_states, 2),
+        'bits': 1 if max(num_states, 2) == 2 else 8,
+        'compression_level': config['compression_level'],
+        # (generation, encoded cells) of the newest generation
+        'latest': None,
+        # generation a viewer last received -> message taking it to the newest generation
+        'messages': {},
+        'viewers': [],
+        'finished': False,
+    }
+    _publish(server, 0, life_state)
+
+    listener = await asyncio.start_server(lambda reader, writer: _handle_connection(server, reader, writer),
+                                          config['host'], config['port'])
+    host, port = listener.sockets[0].getsockname()[:2]
+    print(f"Watch the run at http://{host}:{port}/")
+    if started is not None:
+        started.set_result((host, port))
+
+    loop = asyncio.get_running_loop()
+    buffer = np.empty_like(life_state)
+    generation = 0
+    next_time = time.perf_counter()
+    try:
+        async with listener:
+            while config['iterations'] is None or generation < config['iterations']:
+                new_life_state = await loop.run_in_executor(None, step, life_state, buffer)
+                buffer, life_state = life_state, new_life_state
+                generation += 1
+                _publish(server, generation, life_state)
+                if config['fps']:
+                    next_time = max(next_time + 1 / config['fps'], time.perf_counter())
+                    await asyncio.sleep(next_time - time.perf_counter())
+                else:
+                    # Let the viewers run between generations
+                    await asyncio.sleep(0)
+    finally:
+        server['finished'] = True
+        for viewer in list(server['viewers']):
+            viewer['new_frame'].set()
+    return life_state
+
+
+async def receive_frames(host='127.0.0.1', port=DEFAULT_CONFIG['port'], num_frames=None):
+    """
+    A minimal viewer without a browser: connect to a server and yield the frames it streams.
+
+    IN:
+        host, port: where the server listens.
+        num_frames (int, optional): stop after this many frames, otherwise read until the server closes.
+
+    OUT:
+        async generator of (generation, life_state).
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(np.random.bytes(16)).decode()
+    writer.write((f"GET /frames HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    response = await reader.readuntil(b'\r\n\r\n')
+    if not response.startswith(b'HTTP/1.1 101'):
+        writer.close()
+        raise ConnectionError(f"The server refused the WebSocket: {response.splitlines()[0].decode()}")
+
+    cells = None
+    received = 0
+    try:
+        while num_frames is None or received < num_frames:
+            try:
+                opcode, message = await _read_websocket_message(reader)
+            except asyncio.IncompleteReadError:
+                break
+            if opcode == _CLOSE:
+                break
+            generation, life_state, cells = decode_frame(message, cells)
+            received += 1
+            yield generation, life_state
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    """
+    Command line entry point, e.g.
+        python -m game_of_life.server --level 2 --rows 200 --columns 200 --fps 20
+    then open http://127.0.0.1:8765/ in a browser. Takes the same settings as batch mode, plus --host, --port
+    and --fps.
+    IN:
+        argv (list of str, optional): the arguments, defaults to sys.argv.
+    OUT: None
+    """
+    parser = argparse.ArgumentParser(description="Stream a Game of Life run to browsers on this machine.")
+    parser.add_argument('--config', help="JSON file with the settings")
+    parser.add_argument('--level', type=int, choices=[1, 2, 3])
+    parser.add_argument('--rows', type=int)
+    parser.add_argument('--columns', type=int)
+    parser.add_argument('--probability', type=float, help="probability of a cell being alive (levels 1 and 2)")
+    parser.add_argument('--probabilities', type=lambda text: [float(p) for p in text.split(',')],
+                        help="comma separated probability of each state (level 3)")
+    parser.add_argument('--states', type=lambda text: [int(state) for state in text.split(',')],
+                        help="comma separated states (level 3)")
+    parser.add_argument('--rules', help="JSON rules file (level 3)")
+    for bound in ['b1', 'b2', 'd1', 'd2']:
+        parser.add_argument(f'--{bound}', type=int)
+    parser.add_argument('--iterations', type=int, help="stop after this many generations (default: never)")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--fps', type=float, help="generations per second, 0 for as fast as possible")
+    args = vars(parser.parse_args(argv))
+
+    config = dict(DEFAULT_CONFIG)
+    if args.get('config'):
+        with open(args['config'], 'r') as file:
+            config.update(json.load(file))
+    config.update({key: value for key, value in args.items() if value is not None and key != 'config'})
+    try:
+        asyncio.run(serve_life_state(config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import numpy as np
+
+from .life import NEIGHBORS
+
+#cells are hashed into one int64 key: (row + _OFFSET) * _STRIDE + (col + _OFFSET)
+#so rows and columns can range from -2**30 to 2**30
+_STRIDE = 1 << 32
+_OFFSET = 1 << 30
+_NEIGHBOR_KEYS = np.array([di * _STRIDE + dj for di, dj in NEIGHBORS], dtype=np.int64)
+
+
+#helper functions that convert between (row, col) coordinates and int64 keys
+def _to_keys(cells):
+    return (cells[:, 0] + _OFFSET) * _STRIDE + (cells[:, 1] + _OFFSET)
+
+
+def _to_cells(keys):
+    rows, cols = np.divmod(keys, _STRIDE)
+    return np.stack([rows - _OFFSET, cols - _OFFSET], axis=1)
+
+
+def life_state_to_cells(life_state, row=0, col=0):
+    """
+    Convert a grid into a sparse universe: the coordinates of its live cells only.
+
+    IN:
+        life_state (ndarray of shape (n, m)): grid where 0 is dead and anything else is alive.
+        row, col (int): coordinates given to cell (0, 0) of the grid in the universe.
+
+    OUT:
+        ndarray of shape (k, 2) and dtype int64: sorted (row, col) of the k live cells.
+    """
+    rows, cols = np.nonzero(life_state)
+    return np.stack([rows + row, cols + col], axis=1).astype(np.int64)
+
+
+def cells_to_life_state(cells):
+    """
+    Export the bounding box of a sparse universe as a grid for draw_life_state_1 and save_to_csv.
+
+    IN:
+        cells (ndarray of shape (k, 2)): (row, col) of the live cells.
+
+    OUT:
+        life_state (ndarray of shape (n, m)): bool grid of the smallest box holding every live cell
+                                             (shape (0, 0) when there are no live cells).
+        origin (tuple of int): universe coordinates of cell (0, 0) of the grid.
+    """
+    if len(cells) == 0:
+        return np.zeros((0, 0), dtype=bool), (0, 0)
+    top, left = cells.min(axis=0)
+    bottom, right = cells.max(axis=0)
+    life_state = np.zeros((bottom - top + 1, right - left + 1), dtype=bool)
+    life_state[cells[:, 0] - top, cells[:, 1] - left] = True
+    return life_state, (int(top), int(left))
+
+
+def update_sparse_life_state(cells, b1=3, b2=3, d1=2, d2=3):
+    """
+    Compute the next generation of an unbounded universe with the same custom bounds as update_life_state_2.
+    Only live cells and their neighbors are looked at, so the cost and memory follow the population.
+
+    IN:
+        cells (ndarray of shape (k, 2)): (row, col) of the live cells.
+        b1 (int): Lower bound of the number of neighbors for a dead cell to come to life.
+        b2 (int): Upper bound of the number of neighbors for a dead cell to come to life.
+        d1 (int): Lower bound of the number of neighbors for an alive cell to continue being alive.
+        d2 (int): Upper bound of the number of neighbors for an alive cell to continue being alive.
+
+    OUT:
+        ndarray of shape (k', 2): sorted (row, col) of the live cells in the next generation.
+    """
+    if b1 <= 0 <= b2:
+        raise ValueError("b1 must be at least 1 in an unbounded universe, otherwise every empty cell comes to life.")
+
+    alive_keys = np.unique(_to_keys(cells))
+    if len(alive_keys) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    # Every live cell adds one to each of its 8 neighbors
+    neighbor_keys, alive_neighbors = np.unique((alive_keys[:, None] + _NEIGHBOR_KEYS[None, :]).ravel(),
+                                               return_counts=True)
+    position = np.searchsorted(alive_keys, neighbor_keys)
+    is_alive = alive_keys[np.minimum(position, len(alive_keys) - 1)] == neighbor_keys
+
+    born = ~is_alive & (b1 <= alive_neighbors) & (alive_neighbors <= b2)
+    survives = is_alive & (d1 <= alive_neighbors) & (alive_neighbors <= d2)
+    next_keys = neighbor_keys[born | survives]
+
+    # Live cells without any live neighbor never show up above
+    if d1 <= 0 <= d2:
+        lonely = alive_keys[~np.isin(alive_keys, neighbor_keys, assume_unique=True)]
+        next_keys = np.union1d(next_keys, lonely)
+
+    return _to_cells(next_keys)
+
+
+def play_sparse_life_state(cells, num_iterations, b1=3, b2=3, d1=2, d2=3):
+    """
+    Run several generations of an unbounded universe.
+
+    IN:
+        cells (ndarray of shape (k, 2)): (row, col) of the live cells.
+        num_iterations (int): number of generations to run.
+        b1, b2, d1, d2 (int): the custom bounds, see update_sparse_life_state.
+
+    OUT:
+        ndarray of shape (k', 2): (row, col) of the live cells after num_iterations generations.
+    """
+    for iteration in range(num_iterations):
+        cells = update_sparse_life_state(cells, b1, b2, d1, d2)
+        # Nothing can come to life from an empty universe
+        if len(cells) == 0:
+            break
+    return cells
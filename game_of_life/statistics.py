@@ -0,0 +1,202 @@
+import struct
+
+import numpy as np
+
+#file layout:
+#   header: magic, number of columns, then the name of every column (length, utf-8 bytes)
+#   blocks: number of rows, then every column of the block one after the other (int64, little endian)
+#a block is written every block_size generations, so memory use does not grow with the run, and a reader can
+#fetch one column by skipping over the others
+MAGIC = b'GOLSTAT1'
+DEFAULT_BLOCK_SIZE = 4096
+#largest number of cells looked at at once when counting transitions, so the temporaries stay small
+CHUNK_CELLS = 1 << 20
+_HEADER = struct.Struct('<8sI')
+_BLOCK = struct.Struct('<I')
+
+
+def get_statistics_columns(num_states=2):
+    """
+    IN:
+        num_states (int): number of cell states.
+    OUT:
+        list of str: the columns of a statistics file. population counts the non-zero cells, births the cells
+                     that went from 0 to another state, deaths the reverse, changed every cell whose state changed,
+                     and state_<s> the number of cells in state s.
+    """
+    return ['generation', 'population', 'births', 'deaths', 'changed'] + [f'state_{state}'
+                                                                         for state in range(num_states)]
+
+
+def create_statistics(filename, num_states=2, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Create a collector of per-generation statistics that streams them to an append-only columnar file.
+    Pass it as statistics= to update_life_state_1, update_life_state_2 or update_life_state_3_compiled and
+    they record every generation while updating; only block_size generations are ever kept in memory.
+
+    IN:
+        filename (str): the statistics file to create (overwritten if it exists).
+        num_states (int): number of cell states, 2 for levels 1 and 2.
+        block_size (int): number of generations written at a time.
+
+    OUT:
+        dict: the collector. Record generation 0 with record_generation(statistics, life_state) before updating.
+    """
+    columns = get_statistics_columns(num_states)
+    statistics = {
+        'file': open(filename, 'wb'),
+        'num_states': num_states,
+        'columns': columns,
+        'block': np.zeros((len(columns), block_size), dtype='<i8'),
+        'rows': 0,
+        'generation': -1,
+        # number of cells in each state at the last recorded generation
+        'counts': None,
+    }
+    statistics['file'].write(_HEADER.pack(MAGIC, len(columns)))
+    for name in columns:
+        encoded = name.encode()
+        statistics['file'].write(struct.pack('<B', len(encoded)) + encoded)
+    return statistics
+
+
+def count_changes(life_state, new_life_state, num_states=2, out_changes=None):
+    """
+    Count how many cells went from each state to each other state, in one pass over the two grids.
+
+    IN:
+        life_state (ndarray): the grid (or band of rows) before the update.
+        new_life_state (ndarray): the same cells after the update.
+        num_states (int): number of cell states.
+        out_changes (ndarray of shape (num_states, num_states), optional): counts to add to, e.g. over row bands.
+
+    OUT:
+        ndarray of shape (num_states, num_states): out_changes[a, b] is the number of cells that went from state a
+                                                   to state b (the diagonal, cells that kept their state, is 0).
+    """
+    if out_changes is None:
+        out_changes = np.zeros((num_states, num_states), dtype=np.int64)
+    if num_states == 2:
+        # With two states a cell was born where the new grid is above the old one and died where it is below
+        old, new = life_state != 0, new_life_state != 0
+        out_changes[0, 1] += np.count_nonzero(new > old)
+        out_changes[1, 0] += np.count_nonzero(new < old)
+        return out_changes
+
+    old, new = life_state.reshape(-1), new_life_state.reshape(-1)
+    code_type = np.uint8 if num_states ** 2 <= 256 else np.intp
+    for start in range(0, old.size, CHUNK_CELLS):
+        # Every (old state, new state) pair gets its own code, so one bincount counts all the transitions
+        codes = old[start:start + CHUNK_CELLS].astype(code_type) * code_type(num_states)
+        codes += new[start:start + CHUNK_CELLS].astype(code_type)
+        out_changes += np.bincount(codes, minlength=num_states ** 2)[:num_states ** 2].reshape(num_states,
+                                                                                              num_states)
+    np.fill_diagonal(out_changes, 0)
+    return out_changes
+
+
+def record_generation(statistics, life_state=None, previous_life_state=None, changes=None):
+    """
+    Record the next generation. The update functions call this themselves when given statistics=; call it
+    directly for generation 0 (with only life_state) or for engines that do not take statistics.
+
+    IN:
+        statistics (dict): the collector from create_statistics.
+        life_state (ndarray of shape (n, m), optional): the new generation.
+        previous_life_state (ndarray of shape (n, m), optional): the generation before it.
+        changes (ndarray of shape (num_states, num_states), optional): the transitions from count_changes, if the
+                                                                      engine already counted them. The state counts
+                                                                      are then updated from them without looking
+                                                                      at the grid.
+
+    OUT: None
+    """
+    num_states = statistics['num_states']
+    if changes is None and previous_life_state is not None:
+        changes = count_changes(previous_life_state, life_state, num_states)
+    if statistics['counts'] is None or changes is None:
+        if life_state is None:
+            raise ValueError("The first generation needs its grid to count the states.")
+        statistics['counts'] = np.bincount(life_state.reshape(-1).astype(np.intp), minlength=num_states)
+        changes = np.zeros((num_states, num_states), dtype=np.int64) if changes is None else changes
+    else:
+        statistics['counts'] = statistics['counts'] - changes.sum(axis=1) + changes.sum(axis=0)
+
+    counts = statistics['counts']
+    statistics['generation'] += 1
+    row = statistics['rows']
+    statistics['block'][:, row] = [statistics['generation'], counts[1:].sum(), changes[0, 1:].sum(),
+                                   changes[1:, 0].sum(), changes.sum()] + counts.tolist()
+    statistics['rows'] += 1
+    if statistics['rows'] == statistics['block'].shape[1]:
+        flush_statistics(statistics)
+
+
+def flush_statistics(statistics):
+    """
+    Write the generations recorded since the last flush to the file.
+    IN:
+        statistics (dict): the collector from create_statistics.
+    OUT: None
+    """
+    rows = statistics['rows']
+    if rows == 0:
+        return
+    file = statistics['file']
+    file.write(_BLOCK.pack(rows))
+    file.write(np.ascontiguousarray(statistics['block'][:, :rows]).tobytes())
+    file.flush()
+    statistics['rows'] = 0
+
+
+def close_statistics(statistics):
+    """
+    Write the last generations and close the file.
+    IN:
+        statistics (dict): the collector from create_statistics.
+    OUT: None
+    """
+    flush_statistics(statistics)
+    statistics['file'].close()
+
+
+def read_statistics(filename, columns=None):
+    """
+    Read a statistics file. Only the requested columns are read; a block cut short (e.g. the run crashed while
+    writing it) is ignored.
+
+    IN:
+        filename (str): the statistics file.
+        columns (list of str, optional): the columns to read, all of them if None.
+
+    OUT:
+        dict: column name -> 1D int64 ndarray with one value per generation.
+    """
+    with open(filename, 'rb') as file:
+        magic, num_columns = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a Game of Life statistics file.")
+        names = []
+        for _ in range(num_columns):
+            length, = struct.unpack('<B', file.read(1))
+            names.append(file.read(length).decode())
+        if columns is None:
+            columns = names
+        unknown = set(columns) - set(names)
+        if unknown:
+            raise ValueError(f"{filename} has no column(s) {sorted(unknown)}, it has {names}.")
+
+        file_size = file.seek(0, 2)
+        position = _HEADER.size + sum(1 + len(name.encode()) for name in names)
+        parts = {name: [] for name in columns}
+        while position + _BLOCK.size <= file_size:
+            file.seek(position)
+            rows, = _BLOCK.unpack(file.read(_BLOCK.size))
+            block_start = position + _BLOCK.size
+            if block_start + 8 * rows * num_columns > file_size:
+                break
+            for name in columns:
+                file.seek(block_start + 8 * rows * names.index(name))
+                parts[name].append(np.frombuffer(file.read(8 * rows), dtype='<i8'))
+            position = block_start + 8 * rows * num_columns
+    return {name: np.concatenate(values) if values else np.zeros(0, dtype='<i8') for name, values in parts.items()}
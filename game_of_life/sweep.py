@@ -0,0 +1,126 @@
+import csv
+import hashlib
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .life import update_life_state_2
+
+#columns of the results table, in order
+RESULT_COLUMNS = ['b1', 'b2', 'd1', 'd2', 'p', 'seed', 'final_population', 'stabilization_generation', 'period']
+
+
+def get_rule_space(low=0, high=8):
+    """
+    Return every birth/survival window with bounds between low and high.
+
+    IN:
+        low, high (int): smallest and largest bound to try.
+
+    OUT:
+        list of (b1, b2, d1, d2) tuples with b1 <= b2 and d1 <= d2.
+    """
+    windows = [(lower, upper) for lower in range(low, high + 1) for upper in range(lower, high + 1)]
+    return [(b1, b2, d1, d2) for (b1, b2), (d1, d2) in itertools.product(windows, windows)]
+
+
+#helper function that returns a 128-bit digest of a grid, so two different grids practically never collide
+def _fingerprint(life_state):
+    return hashlib.blake2b(life_state.tobytes(), digest_size=16).digest()
+
+
+def run_rule(b1, b2, d1, d2, p, seed, n=64, m=64, num_iterations=500, max_period=64):
+    """
+    Run one random board with custom bounds until it repeats or the iterations run out.
+
+    IN:
+        b1, b2, d1, d2 (int): the custom bounds of update_life_state_2.
+        p (float): probability of a cell being alive at the start.
+        seed (int): seed of the initial board, which is the board init_life_state_2 draws after np.random.seed(seed).
+                    The global random state is not touched.
+        n, m (int): dimensions of the grid.
+        num_iterations (int): maximum number of generations.
+        max_period (int): longest period that is detected; older generations are forgotten.
+
+    OUT:
+        dict with the inputs, the final population, the first generation of the repeating cycle
+        and the period of the cycle (-1 and 0 if the board did not repeat).
+    """
+    # A generator of its own, so a run in the caller's process leaves the caller's np.random state alone
+    life_state = np.random.RandomState(seed).rand(n, m) < p
+    buffer = np.empty_like(life_state)
+
+    # Fingerprints of the last max_period generations and the generation they were seen at
+    seen = {_fingerprint(life_state): 0}
+    history = deque(seen)
+    stabilization_generation, period = -1, 0
+    for iteration in range(1, num_iterations + 1):
+        update_life_state_2(life_state, b1, b2, d1, d2, out_life_state=buffer)
+        life_state, buffer = buffer, life_state
+        key = _fingerprint(life_state)
+        if key in seen:
+            stabilization_generation = seen[key]
+            period = iteration - seen[key]
+            break
+        seen[key] = iteration
+        history.append(key)
+        if len(history) > max_period:
+            del seen[history.popleft()]
+
+    return {'b1': b1, 'b2': b2, 'd1': d1, 'd2': d2, 'p': p, 'seed': seed,
+            'final_population': int(np.count_nonzero(life_state)),
+            'stabilization_generation': stabilization_generation, 'period': period}
+
+
+#helper function that unpacks one job for the worker processes
+def _run_job(job):
+    (b1, b2, d1, d2), p, seed, settings = job
+    return run_rule(b1, b2, d1, d2, p, seed, **settings)
+
+
+def run_sweep(rule_tuples, densities, seeds, results_filename=None, num_workers=None, chunksize=16,
+              n=64, m=64, num_iterations=500, max_period=64):
+    """
+    Run every combination of rule, density and seed in a process pool and collect one row per run.
+
+    IN:
+        rule_tuples (list of (b1, b2, d1, d2)): the rules to try, e.g. from get_rule_space.
+        densities (list of float): probabilities of a cell being alive at the start.
+        seeds (list of int): seeds of the initial boards.
+        results_filename (str, optional): CSV file the results table is written to.
+        num_workers (int, optional): number of worker processes, 1 runs everything in this process.
+                                     If None, one per CPU core.
+        chunksize (int): number of runs sent to a worker at a time.
+        n, m, num_iterations, max_period (int): see run_rule.
+
+    OUT:
+        list of dict: one row per run with the columns in RESULT_COLUMNS.
+    """
+    settings = {'n': n, 'm': m, 'num_iterations': num_iterations, 'max_period': max_period}
+    jobs = [(rule, p, seed, settings) for rule in rule_tuples for p in densities for seed in seeds]
+
+    if num_workers == 1:
+        results = [_run_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = list(executor.map(_run_job, jobs, chunksize=chunksize))
+
+    if results_filename is not None:
+        save_sweep_to_csv(results, results_filename)
+    return results
+
+
+def save_sweep_to_csv(results, filename):
+    """
+    Save the rows of a sweep to a CSV file.
+    IN:
+        results (list of dict): rows from run_sweep.
+        filename (str): The name of the file to save the table.
+    OUT: None
+    """
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
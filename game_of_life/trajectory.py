@@ -0,0 +1,242 @@
+import struct
+import zlib
+
+import numpy as np
+
+from .instrumentation import phase
+
+#file layout:
+#   header: magic, rows, columns, bits per cell (1 or 8), keyframe interval, dtype of the grid
+#   frames: kind (keyframe or delta), payload length, zlib payload; generation g is frame g
+#   footer (written on close): the byte offset of every frame, the number of generations, the offset of that index
+#a keyframe holds the whole grid (bit-packed for 2 states, one byte per cell otherwise) and a delta holds the
+#XOR with the previous generation, so reading generation g only replays the frames since the last keyframe
+MAGIC = b'GOLTRAJ1'
+INDEX_MAGIC = b'GOLINDEX'
+KEYFRAME, DELTA = 0, 1
+_HEADER = struct.Struct('<8sIIBI8s')
+_FRAME = struct.Struct('<BI')
+_FOOTER = struct.Struct('<QQ8s')
+
+
+#helper function that turns a grid into the bytes stored for it (bit-packed or one uint8 per cell)
+def _encode(trajectory, life_state):
+    if life_state.shape != trajectory['shape']:
+        raise ValueError(f"Expected a grid of shape {trajectory['shape']}, got {life_state.shape}.")
+    if life_state.size and (life_state.min() < 0 or life_state.max() >= trajectory['num_states']):
+        raise ValueError(f"Cell states must be between 0 and {trajectory['num_states'] - 1}.")
+    if trajectory['bits'] == 1:
+        return np.packbits(life_state.ravel() != 0)
+    return life_state.ravel().astype(np.uint8)
+
+
+#helper function that turns the stored bytes back into a grid
+def _decode(trajectory, encoded):
+    n, m = trajectory['shape']
+    if trajectory['bits'] == 1:
+        cells = np.unpackbits(encoded, count=n * m)
+    else:
+        cells = encoded
+    return cells.reshape(n, m).astype(trajectory['dtype'])
+
+
+def _write_frame(trajectory, kind, encoded):
+    payload = zlib.compress(encoded.tobytes(), trajectory['compression_level'])
+    trajectory['offsets'].append(trajectory['file'].tell())
+    trajectory['file'].write(_FRAME.pack(kind, len(payload)))
+    trajectory['file'].write(payload)
+
+
+def create_trajectory(filename, life_state, num_states=2, keyframe_interval=100, compression_level=1):
+    """
+    Start recording a run: create the file and store life_state as generation 0.
+
+    IN:
+        filename (str): the trajectory file to create (overwritten if it exists).
+        life_state (ndarray of shape (n, m)): the initial grid.
+        num_states (int): number of cell states, 2 for levels 1 and 2. Two states are stored as 1 bit per cell,
+                          up to 256 states as 1 byte per cell.
+        keyframe_interval (int): store the whole grid every this many generations, and only the cells that
+                                 changed in between. Smaller is faster to seek, larger is smaller on disk.
+        compression_level (int): zlib level, 1 is fastest, 9 is smallest.
+
+    OUT:
+        dict: the open trajectory, pass it to append_generation and close_trajectory.
+    """
+    if not 2 <= num_states <= 256:
+        raise ValueError("num_states must be between 2 and 256.")
+    if keyframe_interval < 1:
+        raise ValueError("keyframe_interval must be at least 1.")
+    n, m = life_state.shape
+    trajectory = {
+        'file': open(filename, 'wb'),
+        'mode': 'w',
+        'shape': (n, m),
+        'dtype': life_state.dtype,
+        'num_states': num_states,
+        'bits': 1 if num_states == 2 else 8,
+        'keyframe_interval': keyframe_interval,
+        'compression_level': compression_level,
+        'offsets': [],
+        'previous': None,
+    }
+    trajectory['file'].write(_HEADER.pack(MAGIC, n, m, trajectory['bits'], keyframe_interval,
+                                          life_state.dtype.str.encode()))
+    append_generation(trajectory, life_state)
+    return trajectory
+
+
+def append_generation(trajectory, life_state):
+    """
+    Store the next generation of a run.
+    IN:
+        trajectory (dict): the trajectory returned by create_trajectory.
+        life_state (ndarray of shape (n, m)): the grid of the next generation.
+    OUT: None
+    """
+    with phase('save_trajectory'):
+        encoded = _encode(trajectory, life_state)
+        if len(trajectory['offsets']) % trajectory['keyframe_interval'] == 0:
+            _write_frame(trajectory, KEYFRAME, encoded)
+        else:
+            # Unchanged cells XOR to 0, which zlib squeezes down to almost nothing
+            _write_frame(trajectory, DELTA, np.bitwise_xor(encoded, trajectory['previous']))
+        trajectory['previous'] = encoded
+
+
+def close_trajectory(trajectory):
+    """
+    Close a trajectory. For a recording, this first writes the index of the frames that makes seeking instant.
+    IN:
+        trajectory (dict): the trajectory returned by create_trajectory or open_trajectory.
+    OUT: None
+    """
+    file = trajectory['file']
+    if trajectory['mode'] == 'w' and not file.closed:
+        index_offset = file.tell()
+        file.write(np.asarray(trajectory['offsets'], dtype='<u8').tobytes())
+        file.write(_FOOTER.pack(len(trajectory['offsets']), index_offset, INDEX_MAGIC))
+    file.close()
+
+
+#helper function that finds the frames of a file that was never closed (e.g. the run crashed) by walking them
+def _scan_frames(file, start):
+    offsets = []
+    file.seek(0, 2)
+    end = file.tell()
+    position = start
+    while position + _FRAME.size <= end:
+        file.seek(position)
+        kind, length = _FRAME.unpack(file.read(_FRAME.size))
+        if kind not in (KEYFRAME, DELTA) or position + _FRAME.size + length > end:
+            break
+        offsets.append(position)
+        position += _FRAME.size + length
+    return offsets
+
+
+def open_trajectory(filename):
+    """
+    Open a recorded trajectory for reading. Only the header and the index are read, so this is instant even
+    for very long runs. Files that were not closed are still readable up to their last complete frame.
+
+    IN:
+        filename (str): the trajectory file.
+
+    OUT:
+        dict: the open trajectory; 'num_generations' is the number of stored generations.
+    """
+    file = open(filename, 'rb')
+    magic, n, m, bits, keyframe_interval, dtype = _HEADER.unpack(file.read(_HEADER.size))
+    if magic != MAGIC:
+        file.close()
+        raise ValueError(f"{filename} is not a Game of Life trajectory file.")
+
+    offsets = None
+    file.seek(0, 2)
+    size = file.tell()
+    if size >= _HEADER.size + _FOOTER.size:
+        file.seek(size - _FOOTER.size)
+        num_generations, index_offset, index_magic = _FOOTER.unpack(file.read(_FOOTER.size))
+        if index_magic == INDEX_MAGIC and index_offset + 8 * num_generations + _FOOTER.size == size:
+            file.seek(index_offset)
+            offsets = np.frombuffer(file.read(8 * num_generations), dtype='<u8').astype(np.int64)
+    if offsets is None:
+        offsets = np.array(_scan_frames(file, _HEADER.size), dtype=np.int64)
+
+    return {
+        'file': file,
+        'mode': 'r',
+        'shape': (n, m),
+        'dtype': np.dtype(dtype.rstrip(b'\0').decode()),
+        'bits': bits,
+        'keyframe_interval': keyframe_interval,
+        'offsets': offsets,
+        'num_generations': len(offsets),
+        # last decoded generation, so reading forward does not go back to the keyframe every time
+        'generation': None,
+        'current': None,
+    }
+
+
+#helper function that reads the frames first .. last (inclusive) in one go and yields their decompressed bytes
+def _read_frames(trajectory, first, last):
+    file, offsets = trajectory['file'], trajectory['offsets']
+    file.seek(offsets[first])
+    end = offsets[last + 1] if last + 1 < len(offsets) else None
+    data = file.read(end - offsets[first]) if end is not None else file.read()
+    position = 0
+    for _ in range(first, last + 1):
+        kind, length = _FRAME.unpack_from(data, position)
+        position += _FRAME.size
+        yield kind, np.frombuffer(zlib.decompress(data[position:position + length]), dtype=np.uint8)
+        position += length
+
+
+def read_generation(trajectory, generation):
+    """
+    Read one generation of a recorded run without replaying the whole file: start from the last keyframe
+    at or before it (or from the last generation read, when reading forward) and apply the deltas.
+
+    IN:
+        trajectory (dict): the trajectory returned by open_trajectory.
+        generation (int): the generation to read, 0 is the initial grid; negative values count from the end.
+
+    OUT:
+        ndarray of shape (n, m): the grid at that generation.
+    """
+    num_generations = trajectory['num_generations']
+    if generation < 0:
+        generation += num_generations
+    if not 0 <= generation < num_generations:
+        raise IndexError(f"Generation {generation} is out of range, the trajectory has {num_generations}.")
+
+    keyframe = generation - generation % trajectory['keyframe_interval']
+    last = trajectory['generation']
+    if last is not None and keyframe <= last <= generation:
+        # Continue from the generation we already have
+        current, first = trajectory['current'], last + 1
+    else:
+        current, first = None, keyframe
+
+    if first <= generation:
+        for kind, encoded in _read_frames(trajectory, first, generation):
+            if kind == KEYFRAME:
+                current = encoded.copy()
+            else:
+                np.bitwise_xor(current, encoded, out=current)
+        trajectory['generation'], trajectory['current'] = generation, current
+    return _decode(trajectory, current)
+
+
+def iter_generations(trajectory, start=0, stop=None, step=1):
+    """
+    Yield the grids of generations start, start + step, ... up to (not including) stop.
+    IN:
+        trajectory (dict): the trajectory returned by open_trajectory.
+        start, stop, step (int): the generations to read, like range(); stop defaults to the end of the run.
+    OUT:
+        generator of ndarray of shape (n, m).
+    """
+    for generation in range(*slice(start, stop, step).indices(trajectory['num_generations'])):
+        yield read_generation(trajectory, generation)